@@ -2,7 +2,7 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Optional
 from pydantic import BaseModel
-from voice.voice import handle_live_command, merge_world
+from voice.voice import handle_live_command_async, merge_world
 
 router = APIRouter()
 
@@ -16,7 +16,6 @@ class ModifyRequest(BaseModel):
     progress: Optional[float] = 1.0
     image_data: Optional[str] = None  # base64 encoded image       
 
-@router.patch("/modify-world")
 @router.patch("/modify-world")
 async def modify_world(request: ModifyRequest) -> Dict:
     if not request.command:
@@ -45,10 +44,10 @@ async def modify_world(request: ModifyRequest) -> Dict:
             current_world = request.current_world
             print(f"[API] Using provided current_world")
 
-        print(f"[API] Calling handle_live_command with current_world type: {type(current_world)}")
+        print(f"[API] Calling handle_live_command_async with current_world type: {type(current_world)}")
         
         # Pass current world, player position, lighting interpolation params, and image to AI
-        ai_diff = handle_live_command(
+        ai_diff = await handle_live_command_async(
             command=request.command,
             current_world=current_world,
             player_position=request.player_position,
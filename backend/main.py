@@ -2,6 +2,8 @@ print("="*80)
 print("[MAIN.PY] MODULE LOADING - Middleware should be registered")
 print("="*80)
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -11,14 +13,24 @@ from api.routes.generate import router as generate_router
 from api.routes.update import router as update_router
 from api.routes.health import router as health_router
 from api.routes.scan import router as scan_router
+from voice.voice import close_http_client
 
 print("[MAIN.PY] Routers imported")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release the pooled connections used for LLM calls
+    await close_http_client()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="AI World Builder API",
     description="Voice-driven 3D world generation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 print("[MAIN.PY] FastAPI app created")
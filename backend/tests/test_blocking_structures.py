@@ -0,0 +1,81 @@
+# backend/tests/test_blocking_structures.py
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("CLAUDE_API_KEY", "test")  # the module builds its client at import
+
+from voice.voice import detect_and_remove_blocking_structures, merge_world
+
+
+def _at(x, z, **fields):
+    return {"position": {"x": x, "y": 0, "z": z}, **fields}
+
+
+def _world():
+    return {
+        "world": {},
+        "structures": {
+            # Blockers (A, S, B, R1, T1, P) sit between structures nothing is added near
+            "buildings": [
+                _at(-300, 0, type="house", name="D"),
+                _at(0, 0, type="house", name="A"),
+                _at(50, 0, type="skyscraper", name="S"),
+                _at(100, 100, type="house", name="B"),
+                _at(-200, 0, type="house", name="C"),
+                _at(300, -300, type="skyscraper", name="S2"),
+            ],
+            "rocks": [_at(-100, -100, name="R2"), _at(0, 20, name="R1"), _at(-150, 150, name="R3")],
+            "trees": [_at(-250, 250, name="T0"), _at(200, 0, name="T1"), _at(250, -250, name="T2")],
+            "peaks": [_at(-300, -300, name="P0"), _at(300, 300, name="P"), _at(0, -300, name="P2")],
+        },
+        "combat": {},
+        "physics": {},
+        "spawn_point": {},
+    }
+
+
+def _diff():
+    return {
+        "add": {
+            "trees": [
+                _at(1, 1),    # next to house A
+                _at(2, 0),    # also next to house A - A still counts once
+                _at(50, 3),   # next to the skyscraper
+                _at(0, 22),   # next to rock R1
+            ],
+            "rocks": [_at(201, 0)],                  # next to tree T1
+            "peaks": [_at(305, 300), _at(108, 100)],  # peak P and house B, inside the 10-unit peak radius
+        }
+    }
+
+
+def test_blocking_structures_removal_counts():
+    diff = detect_and_remove_blocking_structures(_diff(), _world())
+
+    # Buildings count once per blocking building, other types once per blocked new item
+    assert diff["remove"] == {"houses": 2, "skyscrapers": 1, "rocks": 1, "trees": 1, "peaks": 1}
+    print("[✓] Blocking structures counted:", diff["remove"])
+
+
+def test_blocking_structures_nothing_nearby():
+    diff = detect_and_remove_blocking_structures({"add": {"trees": [_at(-50, 60)], "rocks": [_at(150, -150)]}}, _world())
+
+    assert diff["remove"] == {}
+    print("[✓] Clear placements remove nothing")
+
+
+def test_merge_removes_blocking_counts_not_blockers():
+    # detect_and_remove_blocking_structures only reports counts; merge_world then removes that many
+    # houses/skyscrapers from the front of their lists and that many other structures from the end,
+    # whichever items those are - not necessarily the ones that blocked
+    world = _world()
+    diff = detect_and_remove_blocking_structures(_diff(), world)
+    merge_world(world, diff)
+
+    structures = world["structures"]
+    names = lambda items: sorted(item.get("name") for item in items if item.get("name"))
+    assert names(structures["buildings"]) == ["B", "C", "S2"]
+    assert names(structures["rocks"]) == ["R1", "R2"]
+    assert names(structures["trees"]) == ["T0", "T1"]
+    assert names(structures["peaks"]) == ["P", "P0"]
+    print("[✓] Merge removes the reported counts by list position")
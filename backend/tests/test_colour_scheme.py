@@ -0,0 +1,53 @@
+# backend/tests/test_colour_scheme.py
+import sys
+import os
+import colorsys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from world.colour_scheme import adjust_shade, rgb_to_hex, _SHADE_PRESETS
+
+
+def _colorsys_shade(rgb, lighten=0.0, darken=0.0, saturate=0.0, desaturate=0.0):
+    # The original full HLS round-trip through colorsys
+    h, l, s = colorsys.rgb_to_hls(*(c / 255.0 for c in rgb))
+    if lighten > 0:
+        l = min(1.0, l + lighten * (1.0 - l))
+    if darken > 0:
+        l = max(0.0, l - darken * l)
+    if saturate > 0:
+        s = min(1.0, s + saturate * (1.0 - s))
+    if desaturate > 0:
+        s = max(0.0, s - desaturate * s)
+    r, g, b = colorsys.hls_to_rgb(h, l, s)
+    return (int(r * 255), int(g * 255), int(b * 255))
+
+
+def test_adjust_shade_fixed_outputs():
+    blue = (51, 95, 151)
+    assert adjust_shade(blue, darken=0.2) == (40, 75, 120)
+    assert adjust_shade(blue, lighten=0.3) == (93, 140, 200)
+    assert adjust_shade(blue, saturate=0.2) == (40, 93, 161)
+    assert adjust_shade(blue, desaturate=0.5) == (76, 97, 126)
+    # Greys have hue 0, so saturating one tints it red; lightening keeps it grey
+    assert adjust_shade((128, 128, 128), saturate=0.4) == (178, 77, 77)
+    assert adjust_shade((128, 128, 128), lighten=0.2) == (153, 153, 153)
+    assert adjust_shade((255, 255, 255), darken=0.5) == (127, 127, 127)
+    assert adjust_shade((200, 30, 30), lighten=1.0) == (255, 255, 255)
+    assert adjust_shade((0, 0, 0), saturate=0.5) == (0, 0, 0)
+    print("[✓] adjust_shade outputs pinned")
+
+
+def test_adjust_shade_matches_colorsys():
+    # Every channel step on each axis, plus greys, against every preset
+    colours = [(v, 95, 151) for v in range(256)] + [(51, v, 151) for v in range(256)] + \
+              [(51, 95, v) for v in range(256)] + [(v, v, v) for v in range(256)]
+    for rgb in colours:
+        for preset in _SHADE_PRESETS.values():
+            assert adjust_shade(rgb, **preset) == _colorsys_shade(rgb, **preset), (rgb, preset)
+    print("[✓] adjust_shade matches the colorsys round-trip exactly")
+
+
+def test_rgb_to_hex_clamps_channels():
+    assert rgb_to_hex((51, 95, 151)) == "#335f97"
+    assert rgb_to_hex([-1, 256, 16]) == "#00ff10"
+    print("[✓] rgb_to_hex clamps out-of-range channels")
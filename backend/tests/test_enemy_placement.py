@@ -0,0 +1,53 @@
+# backend/tests/test_enemy_placement.py
+import sys
+import os
+import math
+import random
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from world.enemy_placer import place_enemies, _place_core, _place_core_grid
+
+# segments == terrain_size, so one grid index is one world unit
+SEGMENTS = 64
+TERRAIN_SIZE = 64.0
+
+
+def _terrain():
+    heightmap = [[(x + z) / (2 * SEGMENTS) for x in range(SEGMENTS + 1)] for z in range(SEGMENTS + 1)]
+    # Walkable everywhere except a blocked band through the middle
+    mask = [[0 if 28 <= z <= 36 else 1 for x in range(SEGMENTS + 1)] for z in range(SEGMENTS + 1)]
+    return heightmap, mask
+
+
+def test_place_enemies_spacing():
+    random.seed(1234)
+    heightmap, mask = _terrain()
+    player = {"x": 0.0, "y": 0.0, "z": 0.0}
+
+    enemies = place_enemies(heightmap, mask, 8, player,
+                            min_player_distance=12.0, min_enemy_distance=9.0, terrain_size=TERRAIN_SIZE)
+
+    assert len(enemies) == 8
+    positions = [(e["position"]["x"], e["position"]["z"]) for e in enemies]
+    for i, (ax, az) in enumerate(positions):
+        assert mask[int(az + TERRAIN_SIZE / 2)][int(ax + TERRAIN_SIZE / 2)] == 1
+        assert math.hypot(ax - player["x"], az - player["z"]) >= 12.0
+        for bx, bz in positions[i + 1:]:
+            assert math.hypot(ax - bx, az - bz) >= 9.0
+    print(f"[✓] {len(enemies)} enemies spaced from each other and the player")
+
+
+def test_place_core_matches_grid_fallback():
+    rng = np.random.default_rng(7)
+    cand = rng.integers(0, SEGMENTS + 1, size=(400, 2))
+    cand_x = np.ascontiguousarray(cand[:, 0])
+    cand_z = np.ascontiguousarray(cand[:, 1])
+
+    for radius in (1.0, 4.5, 9.0, 20.0):
+        chosen, attempts = _place_core(cand_x, cand_z, SEGMENTS + 1, radius, 12)
+        chosen_grid, attempts_grid = _place_core_grid(cand_x, cand_z, SEGMENTS + 1, radius, 12)
+        assert chosen.tolist() == chosen_grid.tolist()
+        assert attempts == attempts_grid
+    print("[✓] Compiled placement kernel matches the spatial-hash fallback")
@@ -0,0 +1,50 @@
+# backend/tests/test_lighting_fog.py
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from world import lighting
+from world.lighting import get_lighting_preset, interpolate_lighting
+
+
+@pytest.fixture
+def fogless_winter_sunset(monkeypatch):
+    # Every shipped biome is foggy at all times or at none, so swap in a fogless winter sunset
+    # to get one foggy and one fogless end within the same biome
+    foggy = lighting._PRESET_CACHE[("sunset", "winter")]
+    monkeypatch.setitem(lighting._PRESET_CACHE, ("sunset", "winter"), lighting._freeze({**foggy, "fog": None}))
+    lighting._preset_arrays.cache_clear()
+    lighting._interpolate_lighting.cache_clear()
+    yield
+    lighting._preset_arrays.cache_clear()
+    lighting._interpolate_lighting.cache_clear()
+
+
+def test_fog_interpolates_between_foggy_presets():
+    # Progress is quantized to 1/255 steps, so 0.5 lands on 128/255
+    fog = interpolate_lighting("noon", "night", 0.5, "arctic")["fog"]
+    assert fog["color"] == "#f2f2ff"
+    assert fog["near"] == 80
+    assert fog["far"] == pytest.approx(500 + (250 - 500) * 128 / 255)
+    assert interpolate_lighting("noon", "night", 0.5, "city")["fog"] is None
+    print("[✓] Fog lerps only when the biome has it")
+
+
+def test_fog_dropped_when_one_end_is_fogless(fogless_winter_sunset):
+    assert get_lighting_preset("noon", "winter")["fog"] is not None
+    assert get_lighting_preset("sunset", "winter")["fog"] is None
+
+    for progress in (0.0, 0.5, 1.0):
+        assert interpolate_lighting("noon", "sunset", progress, "winter")["fog"] is None
+        assert interpolate_lighting("sunset", "noon", progress, "winter")["fog"] is None
+
+    # Everything else still interpolates
+    noon = get_lighting_preset("noon", "winter")
+    sunset = get_lighting_preset("sunset", "winter")
+    mid = interpolate_lighting("noon", "sunset", 0.5, "winter")
+    expected = (noon["ambient"]["intensity"] + sunset["ambient"]["intensity"]) / 2
+    assert mid["ambient"]["intensity"] == pytest.approx(expected)
+    assert mid["northern_lights"] is True
+    print("[✓] Fog is None when either end is fogless")
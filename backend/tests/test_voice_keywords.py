@@ -0,0 +1,46 @@
+# backend/tests/test_voice_keywords.py
+import sys
+import os
+import pytest
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("CLAUDE_API_KEY", "test")  # the module builds its client at import
+
+from voice.voice import _detect_tree_colors, _KEYWORD_AUTOMATON, _KEYWORD_RE, _SCAN_KEYWORDS
+
+_COMMANDS = (
+    "make the trees red, no white",
+    "bright light green bushy trees in fall",
+    "remove all houses and skyscrapers but keep the street_lamps",
+    "scarlet crimson orange yellow gold autumn leaves on dark grey trunks",
+    "redredred greengreen",
+    "add enemies near the rocks and peaks",
+    "no snow no white brown gray",
+    "",
+)
+
+
+def test_no_snow_keeps_autumn_colours():
+    # "no white"/"no snow" forces green leaves unless red/autumn was asked for - for BOTH phrases
+    assert _detect_tree_colors("make the trees red, no white") == ("#8B0000", "#8b4513")
+    assert _detect_tree_colors("make the trees red, no snow") == ("#8B0000", "#8b4513")
+    assert _detect_tree_colors("autumn trees with no white tops") == ("#CD5C5C", "#8b4513")
+    assert _detect_tree_colors("autumn trees with no snow") == ("#CD5C5C", "#8b4513")
+    print("[✓] Red/autumn survive the no-snow guard")
+
+
+def test_no_snow_forces_green():
+    assert _detect_tree_colors("trees with no snow") == ("#228B22", "#8b4513")
+    assert _detect_tree_colors("dark green trees, no white") == ("#228B22", "#8b4513")
+    assert _detect_tree_colors("bushy trees with no snow and grey trunks") == ("#228B22", "#808080")
+    print("[✓] No-snow guard turns leaves forest green")
+
+
+def test_keyword_scanners_agree():
+    if _KEYWORD_AUTOMATON is None:
+        pytest.skip("pyahocorasick not installed")
+    for command in _COMMANDS + (" ".join(_SCAN_KEYWORDS),):
+        automaton = frozenset(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(command))
+        regex = frozenset(_KEYWORD_RE.findall(command))
+        substring = frozenset(keyword for keyword in _SCAN_KEYWORDS if keyword in command)
+        assert automaton == regex == substring, command
+    print("[✓] Aho-Corasick and regex keyword scans agree")
@@ -1,14 +1,34 @@
 # voice.py
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict
+import asyncio
+import importlib.util
+import httpx
 import sounddevice as sd
 import numpy as np
 import queue
 import json
+import logging
+import orjson
 import os
 import random
+import re
+import sys
+from functools import lru_cache
 import math
 from world.lighting import get_lighting_preset, interpolate_lighting  
-from openai import OpenAI
+from world.overshoot_integration import _compact_base64, _decode_base64, _shrink_image
+from openai import AsyncOpenAI
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - placement falls back to the NumPy sampler
+    njit = None
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional - colour keywords fall back to a regex scan
+    ahocorasick = None
 
 """
 voice.py
@@ -22,12 +42,45 @@ Responsible for:
 # Create a queue to hold audio chunks
 audio_queue = queue.Queue()
 
-# Initialize Claude client
-claude_client = OpenAI(
-    api_key=os.getenv("CLAUDE_API_KEY"),
-    base_url="https://openrouter.ai/api/v1" 
+# One pooled HTTP client for every completion call so keep-alive connections (and the
+# TLS handshake) are reused across requests. HTTP/2 needs the optional h2 package.
+# Its pooled connections belong to the event loop that first uses them, so it is only
+# safe inside the FastAPI app's loop (closed by the lifespan via close_http_client).
+# Code running its own loop (asyncio.run in scripts) must pass a client of its own to
+# handle_live_command_async, as handle_live_command does.
+_HTTP = httpx.AsyncClient(
+    http2=importlib.util.find_spec("h2") is not None,
+    timeout=60.0,
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
 )
 
+def _make_claude_client(http_client: httpx.AsyncClient) -> AsyncOpenAI:
+    """Claude (via OpenRouter) client that sends its requests through http_client."""
+    return AsyncOpenAI(
+        api_key=os.getenv("CLAUDE_API_KEY"),
+        base_url="https://openrouter.ai/api/v1",
+        http_client=http_client
+    )
+
+
+# Initialize Claude client (async so a slow completion doesn't block the event loop)
+claude_client = _make_claude_client(_HTTP)
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client; called from the app's lifespan on shutdown, on the app's loop."""
+    await _HTTP.aclose()
+
+# Shared generator for placement sampling (one batch fill instead of per-call random.uniform)
+_RNG = np.random.default_rng()
+
+# Candidates are checked against existing positions in chunks to cap the distance matrix size
+_SAMPLE_CHUNK = 512
+
+
+# Pretty-printed tree/diff dumps are costly on large worlds - they only go to debug logging
+log = logging.getLogger(__name__)
+
 def record_audio(duration: float = 5.0, fs: int = 44100) -> np.ndarray:
     print("[Voice] Recording audio...")
     recording = sd.rec(int(duration * fs), samplerate=fs, channels=1, dtype='int16')
@@ -61,6 +114,101 @@ def summarize_world(world: Dict) -> Dict:
     }
 
 
+def _sample_positions_kernel(count, existing_xz, lo, hi, min_dist, max_attempts, seed):
+    """
+    Sequential rejection sampling loop, compiled with numba when available.
+    Numeric-only: takes a contiguous float32 (n, 2) array of existing positions
+    and returns a float32 (k, 2) array of accepted positions, k <= count.
+    """
+    np.random.seed(seed)
+    min_dist_sq = min_dist * min_dist
+    placed = np.empty((count, 2), dtype=np.float32)
+    n = 0
+    attempts = 0
+    
+    while n < count and attempts < max_attempts:
+        attempts += 1
+        x = np.random.uniform(lo, hi)
+        z = np.random.uniform(lo, hi)
+        
+        ok = True
+        for i in range(existing_xz.shape[0]):
+            dx = x - existing_xz[i, 0]
+            dz = z - existing_xz[i, 1]
+            if dx*dx + dz*dz < min_dist_sq:
+                ok = False
+                break
+        if ok:
+            for i in range(n):
+                dx = x - placed[i, 0]
+                dz = z - placed[i, 1]
+                if dx*dx + dz*dz < min_dist_sq:
+                    ok = False
+                    break
+        if ok:
+            placed[n, 0] = x
+            placed[n, 1] = z
+            n += 1
+    
+    return placed[:n]
+
+
+if njit is not None:
+    _sample_positions_kernel = njit(cache=True)(_sample_positions_kernel)
+
+
+def _sample_positions_numpy(count: int, existing_positions: list, lo: float, hi: float,
+                            min_distance: float, max_attempts: int) -> np.ndarray:
+    """
+    Batch rejection sampling of (x, z) positions (NumPy fallback when numba is missing).
+
+    Draws max_attempts candidates up front, drops those within min_distance of
+    existing positions, then greedily accepts candidates in draw order while
+    keeping them min_distance apart. Same result as the one-candidate-per-iteration
+    loop, without the Python-level distance checks.
+
+    Returns:
+        float32 array of shape (n, 2) with n <= count
+    """
+    if count <= 0 or max_attempts <= 0:
+        return np.empty((0, 2), dtype=np.float32)
+
+    cands = _RNG.uniform(lo, hi, size=(max_attempts, 2)).astype(np.float32)
+    min_dist_sq = min_distance * min_distance
+
+    existing = np.asarray(existing_positions, dtype=np.float32).reshape(-1, 2)
+    if len(existing):
+        keep = np.empty(len(cands), dtype=bool)
+        for start in range(0, len(cands), _SAMPLE_CHUNK):
+            chunk = cands[start:start + _SAMPLE_CHUNK]
+            d2 = ((chunk[:, None, :] - existing[None, :, :]) ** 2).sum(-1).min(-1)
+            keep[start:start + _SAMPLE_CHUNK] = d2 >= min_dist_sq
+        cands = cands[keep]
+
+    placed = np.empty((count, 2), dtype=np.float32)
+    n = 0
+    while n < count and len(cands):
+        p = cands[0]
+        placed[n] = p
+        n += 1
+        rest = cands[1:]
+        cands = rest[((rest - p) ** 2).sum(-1) >= min_dist_sq]
+
+    return placed[:n]
+
+
+def _sample_positions(count: int, existing_positions: list, lo: float, hi: float,
+                      min_distance: float, max_attempts: int) -> np.ndarray:
+    """Sample up to count (x, z) positions at least min_distance apart from each other and from existing_positions."""
+    if njit is None:
+        return _sample_positions_numpy(count, existing_positions, lo, hi, min_distance, max_attempts)
+    
+    existing_xz = np.ascontiguousarray(np.asarray(existing_positions, dtype=np.float32).reshape(-1, 2))
+    seed = int(_RNG.integers(0, 2**31 - 1))
+    return _sample_positions_kernel(max(0, int(count)), existing_xz, float(lo), float(hi),
+                                    float(min_distance), int(max_attempts), seed)
+
+
 def generate_new_buildings(count: int, biome: str, existing_buildings: list, terrain_size: float = 256.0) -> list:
     """Generate new building objects with proper positions"""
     if biome.lower() != "city":
@@ -78,31 +226,17 @@ def generate_new_buildings(count: int, biome: str, existing_buildings: list, ter
     # Extract existing positions
     existing_positions = [(b["position"]["x"], b["position"]["z"]) for b in existing_buildings]
     min_distance = 25
-    
-    attempts = 0
     max_attempts = count * 50
     
-    while len(buildings) < count and attempts < max_attempts:
-        attempts += 1
-        
-        # Random position
-        world_x = random.uniform(-terrain_size/2 + 20, terrain_size/2 - 20)
-        world_z = random.uniform(-terrain_size/2 + 20, terrain_size/2 - 20)
-        
-        # Check distance from existing buildings
-        too_close = False
-        for px, pz in existing_positions:
-            dist = math.sqrt((world_x - px)**2 + (world_z - pz)**2)
-            if dist < min_distance:
-                too_close = True
-                break
-        
-        if too_close:
-            continue
-        
-        # Choose random building type
-        building_type = random.choice(building_types)
-        rotation = random.choice([0, math.pi/2, math.pi, 3*math.pi/2])
+    half = terrain_size / 2 - 20
+    positions = _sample_positions(count, existing_positions, -half, half, min_distance, max_attempts)
+    
+    # Draw every type/rotation in one batch rather than per building
+    type_ix = _RNG.integers(0, len(building_types), size=len(positions)).tolist()
+    rotations = _RNG.choice([0, math.pi/2, math.pi, 3*math.pi/2], size=len(positions)).tolist()
+    
+    for (world_x, world_z), type_i, rotation in zip(positions, type_ix, rotations):
+        building_type = building_types[type_i]
         
         building = {
             "type": "building",
@@ -115,12 +249,101 @@ def generate_new_buildings(count: int, biome: str, existing_buildings: list, ter
         }
         
         buildings.append(building)
-        existing_positions.append((world_x, world_z))
     
     print(f"[VOICE] Generated {len(buildings)} new buildings")
     return buildings
 
 
+# Structure types that can block a new placement
+_BLOCKING_TYPES = ("trees", "rocks", "buildings", "street_lamps", "peaks")
+
+
+def _xz_positions(items: list) -> np.ndarray:
+    """Pack the x/z of every item that has a position into a float32 (n, 2) array."""
+    return np.array(
+        [(item["position"].get("x", 0), item["position"].get("z", 0)) for item in items if "position" in item],
+        dtype=np.float32
+    ).reshape(-1, 2)
+
+
+def _structure_positions(structures: Dict) -> Dict[str, np.ndarray]:
+    """Precompute the existing (n, 2) positions of each blocking structure type once per call."""
+    return {struct_type: _xz_positions(structures.get(struct_type, [])) for struct_type in _BLOCKING_TYPES}
+
+
+def _skyscraper_mask(buildings: list) -> np.ndarray:
+    """Boolean mask aligned with the building positions: True for skyscrapers, False for houses."""
+    return np.array(
+        [b.get("type", "house") == "skyscraper" for b in buildings if "position" in b],
+        dtype=bool
+    )
+
+
+def _build_grid(positions: np.ndarray, cell: float) -> Dict[Tuple[int, int], List[int]]:
+    """Bucket position indices into a uniform grid of cell x cell squares."""
+    grid = defaultdict(list)
+    for i, (x, z) in enumerate(positions.tolist()):
+        grid[(int(x // cell), int(z // cell))].append(i)
+    return grid
+
+
+def _neighbors(grid: Dict[Tuple[int, int], List[int]], x: float, z: float, cell: float) -> List[int]:
+    """Indices stored in the 3x3 block of cells around (x, z) - everything within one cell size."""
+    cx, cz = int(x // cell), int(z // cell)
+    out = []
+    for dx in (-1, 0, 1):
+        for dz in (-1, 0, 1):
+            out.extend(grid.get((cx + dx, cz + dz), ()))
+    return out
+
+
+def _find_blockers(new_positions: np.ndarray, existing: Dict[str, np.ndarray], is_skyscraper: np.ndarray,
+                   radius: float) -> Dict[str, int]:
+    """
+    Count, per structure type, how many new positions land within radius of an existing structure.
+    Blocking buildings are counted once each and split into "houses"/"skyscrapers" via is_skyscraper.
+    """
+    counts = {}
+    if not len(new_positions):
+        return counts
+    
+    radius_sq = radius * radius
+    new_xz = new_positions.tolist()
+    for struct_type in _BLOCKING_TYPES:
+        positions = existing[struct_type]
+        if not len(positions):
+            continue
+        
+        # Grid with cell == radius, so only the 9 surrounding cells can hold a blocker
+        grid = _build_grid(positions, radius)
+        blocked_count = 0
+        blocking = set()
+        for x, z in new_xz:
+            candidates = _neighbors(grid, x, z, radius)
+            if not candidates:
+                continue
+            
+            offsets = positions[candidates] - (x, z)
+            hit = (offsets * offsets).sum(-1) < radius_sq
+            if hit.any():
+                blocked_count += 1
+                blocking.update(np.asarray(candidates)[hit].tolist())
+        
+        if struct_type == "buildings":
+            sky_hits = int(np.count_nonzero(is_skyscraper[list(blocking)])) if blocking else 0
+            counts_by_key = (
+                ("skyscrapers", sky_hits),
+                ("houses", len(blocking) - sky_hits),
+            )
+            for key, key_count in counts_by_key:
+                if key_count:
+                    counts[key] = key_count
+        elif blocked_count:
+            counts[struct_type] = blocked_count
+    
+    return counts
+
+
 def detect_and_remove_blocking_structures(diff: Dict, current_world: Dict, collision_radius: float = 5.0) -> Dict:
     """
     Automatically detect structures blocking new placements and add removal operations.
@@ -141,124 +364,72 @@ def detect_and_remove_blocking_structures(diff: Dict, current_world: Dict, colli
         diff["remove"] = {}
     
     structures = current_world.get("structures", {})
+    existing = _structure_positions(structures)
+    is_skyscraper = _skyscraper_mask(structures.get("buildings", []))
     
-    # Check trees being added
-    if diff["add"].get("trees"):
-        trees_to_add = diff["add"]["trees"]
-        if isinstance(trees_to_add, list):
-            existing_trees = structures.get("trees", [])
-            blocking_count = 0
-            
-            for new_tree in trees_to_add:
-                if "position" in new_tree:
-                    new_x = new_tree["position"].get("x", 0)
-                    new_z = new_tree["position"].get("z", 0)
-                    
-                    # Check against existing trees
-                    for existing_tree in existing_trees:
-                        if "position" in existing_tree:
-                            ex_x = existing_tree["position"].get("x", 0)
-                            ex_z = existing_tree["position"].get("z", 0)
-                            dist = math.sqrt((new_x - ex_x)**2 + (new_z - ex_z)**2)
-                            if dist < collision_radius:
-                                blocking_count += 1
-                                break
-                    
-                    # Check against other structure types
-                    for struct_type in ["rocks", "buildings", "street_lamps", "peaks"]:
-                        existing_structs = structures.get(struct_type, [])
-                        for existing in existing_structs:
-                            if "position" in existing:
-                                ex_x = existing["position"].get("x", 0)
-                                ex_z = existing["position"].get("z", 0)
-                                dist = math.sqrt((new_x - ex_x)**2 + (new_z - ex_z)**2)
-                                if dist < collision_radius:
-                                    # Add removal for this structure type
-                                    if struct_type == "buildings":
-                                        # Check if it's a house or skyscraper
-                                        building_type = existing.get("type", "house")
-                                        if building_type == "skyscraper":
-                                            diff["remove"]["skyscrapers"] = diff["remove"].get("skyscrapers", 0) + 1
-                                        else:
-                                            diff["remove"]["houses"] = diff["remove"].get("houses", 0) + 1
-                                    else:
-                                        diff["remove"][struct_type] = diff["remove"].get(struct_type, 0) + 1
-                                    break
-            
-            if blocking_count > 0:
-                diff["remove"]["trees"] = diff["remove"].get("trees", 0) + blocking_count
-                print(f"[COLLISION] Auto-removing {blocking_count} blocking trees")
-    
-    # Check rocks being added
-    if diff["add"].get("rocks"):
-        rocks_to_add = diff["add"]["rocks"]
-        if isinstance(rocks_to_add, list):
-            existing_rocks = structures.get("rocks", [])
-            blocking_count = 0
-            
-            for new_rock in rocks_to_add:
-                if "position" in new_rock:
-                    new_x = new_rock["position"].get("x", 0)
-                    new_z = new_rock["position"].get("z", 0)
-                    
-                    # Check against existing structures
-                    for struct_type in ["trees", "rocks", "buildings", "street_lamps", "peaks"]:
-                        existing_structs = structures.get(struct_type, [])
-                        for existing in existing_structs:
-                            if "position" in existing:
-                                ex_x = existing["position"].get("x", 0)
-                                ex_z = existing["position"].get("z", 0)
-                                dist = math.sqrt((new_x - ex_x)**2 + (new_z - ex_z)**2)
-                                if dist < collision_radius:
-                                    if struct_type == "buildings":
-                                        building_type = existing.get("type", "house")
-                                        if building_type == "skyscraper":
-                                            diff["remove"]["skyscrapers"] = diff["remove"].get("skyscrapers", 0) + 1
-                                        else:
-                                            diff["remove"]["houses"] = diff["remove"].get("houses", 0) + 1
-                                    else:
-                                        diff["remove"][struct_type] = diff["remove"].get(struct_type, 0) + 1
-                                    blocking_count += 1
-                                    break
-                        if blocking_count > 0:
-                            break
-            
-            if blocking_count > 0:
-                diff["remove"]["rocks"] = diff["remove"].get("rocks", 0) + blocking_count
-                print(f"[COLLISION] Auto-removing {blocking_count} blocking structures for rock placement")
-    
-    # Check peaks being added
-    if diff["add"].get("peaks"):
-        peaks_to_add = diff["add"]["peaks"]
-        if isinstance(peaks_to_add, list):
-            for new_peak in peaks_to_add:
-                if "position" in new_peak:
-                    new_x = new_peak["position"].get("x", 0)
-                    new_z = new_peak["position"].get("z", 0)
-                    
-                    # Check against existing structures (larger radius for peaks)
-                    peak_radius = 10.0
-                    for struct_type in ["trees", "rocks", "buildings", "street_lamps", "peaks"]:
-                        existing_structs = structures.get(struct_type, [])
-                        for existing in existing_structs:
-                            if "position" in existing:
-                                ex_x = existing["position"].get("x", 0)
-                                ex_z = existing["position"].get("z", 0)
-                                dist = math.sqrt((new_x - ex_x)**2 + (new_z - ex_z)**2)
-                                if dist < peak_radius:
-                                    if struct_type == "buildings":
-                                        building_type = existing.get("type", "house")
-                                        if building_type == "skyscraper":
-                                            diff["remove"]["skyscrapers"] = diff["remove"].get("skyscrapers", 0) + 1
-                                        else:
-                                            diff["remove"]["houses"] = diff["remove"].get("houses", 0) + 1
-                                    else:
-                                        diff["remove"][struct_type] = diff["remove"].get(struct_type, 0) + 1
-                                    print(f"[COLLISION] Auto-removing blocking {struct_type} for peak placement")
+    # Trees and rocks use the default radius, peaks need more room
+    for add_type, radius in (("trees", collision_radius), ("rocks", collision_radius), ("peaks", 10.0)):
+        items = diff["add"].get(add_type)
+        if not items or not isinstance(items, list):
+            continue
+        
+        blockers = _find_blockers(_xz_positions(items), existing, is_skyscraper, radius)
+        for struct_type, count in blockers.items():
+            diff["remove"][struct_type] = diff["remove"].get(struct_type, 0) + count
+        if blockers:
+            print(f"[COLLISION] Auto-removing blocking structures for {add_type} placement: {blockers}")
     
     return diff
 
 
+def _rel_front(px: float, pz: float, dir_x: float, dir_z: float, distance: float) -> Tuple[float, float]:
+    return px + dir_x * distance, pz + dir_z * distance
+
+
+def _rel_behind(px: float, pz: float, dir_x: float, dir_z: float, distance: float) -> Tuple[float, float]:
+    return px - dir_x * distance, pz - dir_z * distance
+
+
+def _rel_left(px: float, pz: float, dir_x: float, dir_z: float, distance: float) -> Tuple[float, float]:
+    # Perpendicular to the left (rotate direction 90° counterclockwise)
+    return px - dir_z * distance, pz + dir_x * distance
+
+
+def _rel_right(px: float, pz: float, dir_x: float, dir_z: float, distance: float) -> Tuple[float, float]:
+    # Perpendicular to the right (rotate direction 90° clockwise)
+    return px + dir_z * distance, pz - dir_x * distance
+
+
+# Private stream for near/far placement: plain random() draws without random.uniform's wrapper
+_REL_RNG = random.Random()
+_TWO_PI = 2 * math.pi
+
+
+def _rel_ring(min_dist: float, max_dist: float):
+    """Handler placing the point at a random angle, min_dist-max_dist units from the player."""
+    span = max_dist - min_dist
+    def handler(px: float, pz: float, dir_x: float, dir_z: float, distance: float) -> Tuple[float, float]:
+        angle = _TWO_PI * _REL_RNG.random()
+        dist = min_dist + span * _REL_RNG.random()
+        return px + math.cos(angle) * dist, pz + math.sin(angle) * dist
+    return handler
+
+
+# Relative term -> position handler; unknown terms fall back to "in front"
+_REL_HANDLERS = {
+    term: handler
+    for terms, handler in (
+        (("front", "ahead", "in front", "in front of me", "ahead of me"), _rel_front),
+        (("behind", "behind me", "back", "backward"), _rel_behind),
+        (("left", "to my left", "on my left"), _rel_left),
+        (("right", "to my right", "on my right"), _rel_right),
+        (("near", "close", "near me", "close to me"), _rel_ring(10, 20)),
+        (("far", "far from me", "away", "away from me"), _rel_ring(30, 50)),
+    )
+    for term in terms
+}
+
+
 def calculate_relative_position(
     relative_term: str,
     player_position: Dict,
@@ -293,38 +464,8 @@ def calculate_relative_position(
             dir_x /= length
             dir_z /= length
     
-    relative_term = relative_term.lower().strip()
-    
-    if relative_term in ["front", "ahead", "in front", "in front of me", "ahead of me"]:
-        x = px + dir_x * distance
-        z = pz + dir_z * distance
-    elif relative_term in ["behind", "behind me", "back", "backward"]:
-        x = px - dir_x * distance
-        z = pz - dir_z * distance
-    elif relative_term in ["left", "to my left", "on my left"]:
-        # Perpendicular to the left (rotate direction 90° counterclockwise)
-        x = px - dir_z * distance
-        z = pz + dir_x * distance
-    elif relative_term in ["right", "to my right", "on my right"]:
-        # Perpendicular to the right (rotate direction 90° clockwise)
-        x = px + dir_z * distance
-        z = pz - dir_x * distance
-    elif relative_term in ["near", "close", "near me", "close to me"]:
-        # Random position within 10-20 units
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(10, 20)
-        x = px + math.cos(angle) * dist
-        z = pz + math.sin(angle) * dist
-    elif relative_term in ["far", "far from me", "away", "away from me"]:
-        # Random position 30+ units away
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(30, 50)
-        x = px + math.cos(angle) * dist
-        z = pz + math.sin(angle) * dist
-    else:
-        # Default to in front
-        x = px + dir_x * distance
-        z = pz + dir_z * distance
+    handler = _REL_HANDLERS.get(relative_term.lower().strip(), _rel_front)
+    x, z = handler(px, pz, dir_x, dir_z, distance)
     
     return {"x": float(x), "y": 0.0, "z": float(z)}
 
@@ -339,34 +480,16 @@ def generate_new_street_lamps(count: int, biome: str, existing_street_lamps: lis
     # Extract existing positions
     existing_positions = [(l["position"]["x"], l["position"]["z"]) for l in existing_street_lamps]
     min_distance = 15
-    
-    attempts = 0
     max_attempts = count * 50
     
     # Limit placement range to be closer to center (within 60 units of center)
     center_range = 60
+    positions = _sample_positions(count, existing_positions, -center_range, center_range, min_distance, max_attempts)
     
-    while len(street_lamps) < count and attempts < max_attempts:
-        attempts += 1
-        
-        # Random position within center range
-        world_x = random.uniform(-center_range, center_range)
-        world_z = random.uniform(-center_range, center_range)
-        
-        # Check distance from existing street lamps
-        too_close = False
-        for px, pz in existing_positions:
-            dist = math.sqrt((world_x - px)**2 + (world_z - pz)**2)
-            if dist < min_distance:
-                too_close = True
-                break
-        
-        if too_close:
-            continue
-        
-        scale = random.uniform(0.9, 1.1)
-        rotation = random.uniform(0, math.pi * 2)
-        
+    scales = _RNG.uniform(0.9, 1.1, size=len(positions)).tolist()
+    rotations = _RNG.uniform(0, math.pi * 2, size=len(positions)).tolist()
+    
+    for (world_x, world_z), scale, rotation in zip(positions, scales, rotations):
         street_lamp = {
             "position": {"x": float(world_x), "y": 0, "z": float(world_z)},
             "scale": float(scale),
@@ -374,7 +497,6 @@ def generate_new_street_lamps(count: int, biome: str, existing_street_lamps: lis
         }
         
         street_lamps.append(street_lamp)
-        existing_positions.append((world_x, world_z))
     
     print(f"[VOICE] Generated {len(street_lamps)} new street lamps")
     return street_lamps
@@ -385,28 +507,12 @@ def generate_new_enemies(count: int, existing_enemies: list, terrain_size: float
     enemies = []
     existing_positions = [(e["position"]["x"], e["position"]["z"]) for e in existing_enemies if "position" in e]
     min_distance = 10
-    
-    attempts = 0
     max_attempts = count * 50
     
-    while len(enemies) < count and attempts < max_attempts:
-        attempts += 1
-        
-        # Random position
-        world_x = random.uniform(-terrain_size/2 + 10, terrain_size/2 - 10)
-        world_z = random.uniform(-terrain_size/2 + 10, terrain_size/2 - 10)
-        
-        # Check distance from existing enemies
-        too_close = False
-        for px, pz in existing_positions:
-            dist = math.sqrt((world_x - px)**2 + (world_z - pz)**2)
-            if dist < min_distance:
-                too_close = True
-                break
-        
-        if too_close:
-            continue
-        
+    half = terrain_size / 2 - 10
+    positions = _sample_positions(count, existing_positions, -half, half, min_distance, max_attempts)
+    
+    for world_x, world_z in positions:
         enemy = {
             "id": len(existing_enemies) + len(enemies) + 1,
             "position": {"x": float(world_x), "y": 0, "z": float(world_z)},
@@ -421,55 +527,52 @@ def generate_new_enemies(count: int, existing_enemies: list, terrain_size: float
         }
         
         enemies.append(enemy)
-        existing_positions.append((world_x, world_z))
     
     print(f"[VOICE] Generated {len(enemies)} new enemies")
     return enemies
 
 
-def handle_live_command(
-    command: str,
-    current_world: Optional[Dict] = None,
-    player_position: Optional[Dict] = None,
-    player_direction: Optional[Dict] = None,
-    from_time: Optional[str] = None,
-    to_time: Optional[str] = None,
-    progress: Optional[float] = 1.0,
-    image_data: Optional[str] = None
-) -> Dict:
-    # Log immediately if image is provided
-    if image_data:
-        print(f"[VOICE] ===== IMAGE RECEIVED =====")
-        print(f"[VOICE] Image data length: {len(image_data) if image_data else 0} characters")
-        print(f"[VOICE] Command: {command}")
-    else:
-        print(f"[VOICE] No image data provided")
+def _split_image_data(image_data: str) -> Tuple[str, str]:
     """
-    Fully AI-driven command handler using Claude 4.1.
+    Split an uploaded image into (media_type, base64 payload).
+    Handles both raw base64 and data URLs (data:image/png;base64,...).
+    """
+    image_base64 = image_data
+    media_type = "image/jpeg"  # Default
+    
+    if ',' in image_data:
+        # Extract media type from data URL
+        prefix, image_base64 = image_data.split(',', 1)
+        if 'image/png' in prefix:
+            media_type = "image/png"
+        elif 'image/jpeg' in prefix or 'image/jpg' in prefix:
+            media_type = "image/jpeg"
+        elif 'image/gif' in prefix:
+            media_type = "image/gif"
+        elif 'image/webp' in prefix:
+            media_type = "image/webp"
+    
+    return media_type, image_base64
 
-    Args:
-        command: Player command as text
-        current_world: Optional dict of current world state
-        from_time: Starting time of day for interpolation
-        to_time: Target time of day for interpolation
-        progress: 0.0 to 1.0, interpolation progress
 
-    Returns:
-        A dict delta describing what to add/change in the world
+async def _prepare_image(image_data: str) -> Tuple[str, str]:
     """
-    if current_world is None:
-        current_world = {
-            "world": {},
-            "structures": {},
-            "combat": {},
-            "physics": {},
-            "spawn_point": {}
-        }
+    Strip and decode the uploaded image, then downscale it in a worker thread (same path as the scan route).
+    Returns (media_type, base64 payload); falls back to the original payload if it can't be decoded or shrunk.
+    """
+    media_type, image_base64 = _split_image_data(image_data)
+    raw = _decode_base64(_compact_base64(image_base64))
+    if raw is None:
+        print("[VOICE] Image data is not valid base64, sending original")
+        return media_type, image_base64
+    small_base64 = await asyncio.to_thread(_shrink_image, raw)
+    if small_base64 is None:
+        return media_type, image_base64
+    return "image/jpeg", small_base64
 
-    world_summary = summarize_world(current_world)
-    current_biome = current_world.get("world", {}).get("biome", "city")
 
-    system_prompt = """
+# Static instructions for the live editor; built once at import instead of per request
+_LIVE_SYSTEM_PROMPT = """
 You are a game world editor AI.
 
 Rules:
@@ -615,6 +718,314 @@ BUILDING/ENEMY/STREET_LAMP GENERATION:
 - Example: "add street lamps" or "streetlamps" → {"add": {"street_lamps": 10}}
 """
 
+# Appended to the user prompt when an image is uploaded for tree styling
+_IMAGE_ANALYSIS_INSTRUCTIONS = (
+    "\n\n" + "="*80 + "\n" + "IMAGE ANALYSIS REQUIRED - READ CAREFULLY" + "\n" + "="*80 + "\n\n" +
+    "AN IMAGE HAS BEEN UPLOADED. You MUST analyze it before responding.\n\n" +
+    "STEP 1: ANALYZE THE IMAGE\n" +
+    "- Look at the image carefully\n" +
+    "- Identify the DOMINANT leaf color (e.g., green, red, orange, yellow, brown)\n" +
+    "- Identify the DOMINANT trunk/bark color (e.g., brown, gray, dark brown)\n" +
+    "- Note the overall shape (tall, short, wide, narrow, bushy, sparse)\n" +
+    "- Note any distinctive features (autumn colors, coniferous, deciduous, etc.)\n\n" +
+    "STEP 2: CONVERT COLORS TO HEX\n" +
+    "Common color conversions:\n" +
+    "- Green leaves: '#228B22' (forest green), '#2d5016' (dark green), '#4BBB6D' (bright green)\n" +
+    "- Red/Autumn leaves: '#8B0000' (dark red), '#CD5C5C' (Indian red), '#DC143C' (crimson), '#A52A2A' (brown red)\n" +
+    "- Orange/Autumn leaves: '#FF8C00' (dark orange), '#FF6347' (tomato), '#FF4500' (orange red)\n" +
+    "- Yellow/Autumn leaves: '#FFD700' (gold), '#FFA500' (orange), '#DAA520' (goldenrod)\n" +
+    "- Brown trunks: '#8b4513' (saddle brown), '#654321' (dark brown), '#A0522D' (sienna)\n" +
+    "- Gray trunks: '#808080' (gray), '#696969' (dim gray), '#2F4F4F' (dark slate gray)\n\n" +
+    "STEP 3: BUILD THE RESPONSE\n" +
+    "You MUST use \"set\" with an ARRAY of ALL existing trees.\n" +
+    "For EACH tree in the existing trees list above:\n" +
+    "1. Copy ALL original properties (type, position, scale, rotation, leafless)\n" +
+    "2. ADD \"leaf_color\" field with hex color from image analysis\n" +
+    "3. ADD \"trunk_color\" field with hex color from image analysis\n" +
+    "4. If the image shows autumn/red/orange/yellow leaves, use those colors\n" +
+    "5. If the image shows green leaves, use green shades\n\n" +
+    "EXAMPLE RESPONSE:\n" +
+    "{\n" +
+    "  \"set\": {\n" +
+    "    \"trees\": [\n" +
+    "      {\n" +
+    "        \"type\": \"oak\",\n" +
+    "        \"leafless\": false,\n" +
+    "        \"position\": {\"x\": -112.94, \"y\": 4.60, \"z\": -27.61},\n" +
+    "        \"scale\": 2.10,\n" +
+    "        \"rotation\": 1.93,\n" +
+    "        \"leaf_color\": \"#8B0000\",\n" +
+    "        \"trunk_color\": \"#8b4513\"\n" +
+    "      },\n" +
+    "      // ... ALL other existing trees with same structure + colors\n" +
+    "    ]\n" +
+    "  }\n" +
+    "}\n\n" +
+    "CRITICAL RULES:\n" +
+    "- DO NOT return just a count\n" +
+    "- DO NOT skip any trees\n" +
+    "- EVERY tree MUST have leaf_color and trunk_color fields\n" +
+    "- Use hex format with # prefix (e.g., \"#8B0000\" not 0x8B0000 or 9114624)\n" +
+    "- If you see red/autumn colors in the image, use red/orange/yellow hex codes\n" +
+    "- If you see green in the image, use green hex codes"
+)
+
+
+# Keywords the tree-colour fallback reacts to (plain substring matches, as before)
+_COLOR_KEYWORDS = (
+    "red", "crimson", "scarlet", "orange", "yellow", "gold", "autumn", "fall",
+    "green", "dark", "bright", "light", "bushy", "busy", "no white", "no snow",
+    "gray", "grey", "brown"
+)
+
+# Structure types the remove-all validator looks for in the command
+_STRUCT_TYPES = ("trees", "houses", "skyscrapers", "buildings", "rocks", "peaks", "street_lamps", "enemies")
+
+# Everything found by the single keyword scan over a command
+_SCAN_KEYWORDS = _COLOR_KEYWORDS + _STRUCT_TYPES
+
+# Fallback colours, interned once so every coloured tree dict references the same string objects
+_LEAF_FOREST = sys.intern("#228B22")  # Forest green
+_LEAF_DARK_GREEN = sys.intern("#1a3d0a")
+_LEAF_BRIGHT_GREEN = sys.intern("#4BBB6D")
+_LEAF_DARK_RED = sys.intern("#8B0000")
+_LEAF_DARK_ORANGE = sys.intern("#FF8C00")
+_LEAF_GOLD = sys.intern("#FFD700")
+_LEAF_AUTUMN = sys.intern("#CD5C5C")  # Indian red (autumn red)
+_TRUNK_BROWN = sys.intern("#8b4513")  # Saddle brown
+_TRUNK_DARK_BROWN = sys.intern("#654321")
+_TRUNK_GRAY = sys.intern("#808080")
+
+# Priority-ordered (keywords, refinements, colour) rules: the first rule with a matching keyword
+# wins, then its first matching (keywords, colour) refinement overrides the rule's own colour
+_LEAF_RULES = (
+    # AUTUMN/RED/ORANGE/YELLOW COLORS (highest priority)
+    (frozenset(("red", "autumn", "fall", "orange", "crimson", "scarlet")), (
+        (frozenset(("red", "crimson", "scarlet")), _LEAF_DARK_RED),
+        (frozenset(("orange",)), _LEAF_DARK_ORANGE),
+        (frozenset(("yellow", "gold")), _LEAF_GOLD),
+    ), _LEAF_AUTUMN),
+    # GREEN COLORS
+    (frozenset(("green",)), (
+        (frozenset(("dark",)), _LEAF_DARK_GREEN),
+        (frozenset(("bright", "light")), _LEAF_BRIGHT_GREEN),
+    ), _LEAF_FOREST),
+    # BUSHY/BUSY (typo handling)
+    (frozenset(("bushy", "busy")), (), _LEAF_FOREST),
+)
+_TRUNK_RULES = (
+    (frozenset(("gray", "grey")), (), _TRUNK_GRAY),
+    (frozenset(("brown",)), (
+        (frozenset(("dark",)), _TRUNK_DARK_BROWN),
+    ), _TRUNK_BROWN),
+)
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over _SCAN_KEYWORDS, or None when pyahocorasick is missing."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in _SCAN_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+# Fallback scanner without pyahocorasick: a zero-width lookahead alternation reports every
+# (possibly overlapping) keyword occurrence in one regex walk - same substring semantics as "in".
+# No keyword is a prefix of another, so one alternative per position is enough.
+_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _SCAN_KEYWORDS)) + "))")
+
+
+@lru_cache(maxsize=256)
+def _scan_keywords(command_lower: str) -> frozenset:
+    """
+    Colour and structure keywords occurring in command_lower, found in a single pass.
+    Cached so the colour fallbacks and the remove-all validator share one scan per command.
+    """
+    if _KEYWORD_AUTOMATON is not None:
+        return frozenset(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(command_lower))
+    return frozenset(_KEYWORD_RE.findall(command_lower))
+
+
+def _rules_source(rules: tuple, target: str, default: str, consts: Dict[str, str]) -> List[str]:
+    """
+    Emit source lines for an if/elif chain assigning target from a priority-ordered rule table:
+    the first rule with a matching keyword wins, then its first matching refinement.
+    Colours are referenced through names added to consts so the interned objects are reused.
+    """
+    def const(color: str) -> str:
+        name = f"_C{len(consts)}"
+        consts[name] = color
+        return name
+    
+    def test(keywords: frozenset) -> str:
+        return " or ".join(f"{keyword!r} in matched" for keyword in sorted(keywords))
+    
+    lines = []
+    for i, (keywords, refinements, color) in enumerate(rules):
+        lines.append(f"    {'elif' if i else 'if'} {test(keywords)}:")
+        for j, (refine_keywords, refine_color) in enumerate(refinements):
+            lines.append(f"        {'elif' if j else 'if'} {test(refine_keywords)}:")
+            lines.append(f"            {target} = {const(refine_color)}")
+        if refinements:
+            lines.append("        else:")
+            lines.append(f"            {target} = {const(color)}")
+        else:
+            lines.append(f"        {target} = {const(color)}")
+    lines.append("    else:")
+    lines.append(f"        {target} = {const(default)}")
+    return lines
+
+
+def _compile_color_detector():
+    """Generate _detect_tree_colors from _LEAF_RULES/_TRUNK_RULES as straight-line if/elif code."""
+    consts = {}
+    lines = ["def _detect_tree_colors(command_lower):", "    matched = _scan_keywords(command_lower)"]
+    lines += _rules_source(_LEAF_RULES, "leaf_color", _LEAF_FOREST, consts)
+    # "no white" / "no snow" means fully green unless autumn colours were asked for.
+    # The grouping matters: the red/autumn guard applies to both phrases.
+    lines += [
+        "    if ('no white' in matched or 'no snow' in matched) and 'red' not in matched and 'autumn' not in matched:",
+        "        leaf_color = _LEAF_FOREST",
+    ]
+    lines += _rules_source(_TRUNK_RULES, "trunk_color", _TRUNK_BROWN, consts)
+    lines.append("    return leaf_color, trunk_color")
+    
+    namespace = dict(consts, _scan_keywords=_scan_keywords, _LEAF_FOREST=_LEAF_FOREST)
+    exec(compile("\n".join(lines), "<voice colour rules>", "exec"), namespace)
+    detector = namespace["_detect_tree_colors"]
+    detector.__doc__ = "Pick fallback (leaf_color, trunk_color) hex strings from colour words in the command."
+    return detector
+
+
+_detect_tree_colors = _compile_color_detector()
+
+
+def _fill_missing_colors(trees: list, leaf_color: str, trunk_color: str) -> None:
+    """Give every tree without its own leaf/trunk colour the fallback colours, in place."""
+    setdefault = dict.setdefault  # skip the per-tree method lookup
+    for tree in trees:
+        setdefault(tree, "leaf_color", leaf_color)
+        setdefault(tree, "trunk_color", trunk_color)
+
+
+def _apply_fallback_colors(trees: list, command_lower: str) -> Tuple[str, str]:
+    """Colour trees the model left uncoloured from the command text; returns the colours used."""
+    leaf_color, trunk_color = _detect_tree_colors(command_lower)
+    _fill_missing_colors(trees, leaf_color, trunk_color)
+    return leaf_color, trunk_color
+
+
+def _dumps_capped(obj, cap: int) -> Tuple[str, bool]:
+    """
+    json.dumps(obj, indent=2) cut to at most cap characters. Encoding stops as soon as the cap
+    is passed instead of serializing the whole object. Returns (text, truncated).
+    """
+    parts = []
+    size = 0
+    for chunk in json.JSONEncoder(indent=2).iterencode(obj):
+        parts.append(chunk)
+        size += len(chunk)
+        if size > cap:
+            return "".join(parts)[:cap], True
+    return "".join(parts), False
+
+
+def handle_live_command(
+    command: str,
+    current_world: Optional[Dict] = None,
+    player_position: Optional[Dict] = None,
+    player_direction: Optional[Dict] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+    progress: Optional[float] = 1.0,
+    image_data: Optional[str] = None
+) -> Dict:
+    """
+    Blocking wrapper around handle_live_command_async for scripts and tests.
+
+    Args:
+        command: Player command as text
+        current_world: Optional dict of current world state
+        from_time: Starting time of day for interpolation
+        to_time: Target time of day for interpolation
+        progress: 0.0 to 1.0, interpolation progress
+
+    Returns:
+        A dict delta describing what to add/change in the world
+    """
+    async def _run() -> Dict:
+        # Each asyncio.run gets a fresh event loop, so it can't share the pooled _HTTP client
+        # (bound to the server's loop) - use a client scoped to this call instead
+        async with httpx.AsyncClient(timeout=60.0) as http_client:
+            return await handle_live_command_async(
+                command, current_world, player_position, player_direction,
+                from_time, to_time, progress, image_data,
+                client=_make_claude_client(http_client)
+            )
+
+    return asyncio.run(_run())
+
+
+async def handle_live_command_async(
+    command: str,
+    current_world: Optional[Dict] = None,
+    player_position: Optional[Dict] = None,
+    player_direction: Optional[Dict] = None,
+    from_time: Optional[str] = None,
+    to_time: Optional[str] = None,
+    progress: Optional[float] = 1.0,
+    image_data: Optional[str] = None,
+    client: Optional[AsyncOpenAI] = None
+) -> Dict:
+    # Log immediately if image is provided
+    if image_data:
+        print(f"[VOICE] ===== IMAGE RECEIVED =====")
+        print(f"[VOICE] Image data length: {len(image_data) if image_data else 0} characters")
+        print(f"[VOICE] Command: {command}")
+    else:
+        print(f"[VOICE] No image data provided")
+    """
+    Fully AI-driven command handler using Claude 4.1.
+
+    Args:
+        command: Player command as text
+        current_world: Optional dict of current world state
+        from_time: Starting time of day for interpolation
+        to_time: Target time of day for interpolation
+        progress: 0.0 to 1.0, interpolation progress
+        client: Completion client to use (defaults to the pooled claude_client)
+
+    Returns:
+        A dict delta describing what to add/change in the world
+    """
+    if client is None:
+        client = claude_client
+    command_lower = command.lower()
+    
+    if current_world is None:
+        current_world = {
+            "world": {},
+            "structures": {},
+            "combat": {},
+            "physics": {},
+            "spawn_point": {}
+        }
+
+    # Summarizing the world and preparing the image are independent - run them concurrently
+    if image_data:
+        world_summary, (media_type, image_base64) = await asyncio.gather(
+            asyncio.to_thread(summarize_world, current_world),
+            _prepare_image(image_data)
+        )
+    else:
+        world_summary = await asyncio.to_thread(summarize_world, current_world)
+    current_biome = current_world.get("world", {}).get("biome", "city")
+
     # Build player context for relative positioning
     player_context = ""
     if player_position:
@@ -635,7 +1046,7 @@ BUILDING/ENEMY/STREET_LAMP GENERATION:
     
     user_prompt = f"""
 World summary:
-{json.dumps(world_summary)}
+{orjson.dumps(world_summary).decode()}
 {player_context}
 {existing_trees_info}
 
@@ -645,28 +1056,11 @@ Player command:
 
     # Build messages array - include image if provided
     messages = [
-        {"role": "system", "content": system_prompt}
+        {"role": "system", "content": _LIVE_SYSTEM_PROMPT}
     ]
     
     if image_data:
-        # Image provided - use vision API format
-        # Remove data URL prefix if present (data:image/png;base64,)
-        image_base64 = image_data
-        media_type = "image/jpeg"  # Default
-        
-        if ',' in image_data:
-            # Extract media type from data URL
-            prefix = image_data.split(',')[0]
-            if 'image/png' in prefix:
-                media_type = "image/png"
-            elif 'image/jpeg' in prefix or 'image/jpg' in prefix:
-                media_type = "image/jpeg"
-            elif 'image/gif' in prefix:
-                media_type = "image/gif"
-            elif 'image/webp' in prefix:
-                media_type = "image/webp"
-            image_base64 = image_data.split(',')[1]
-        
+        # Image provided - use vision API format (data URL prefix already stripped above)
         messages.append({
             "role": "user",
             "content": [
@@ -680,54 +1074,7 @@ Player command:
                 },
                 {
                     "type": "text",
-                    "text": user_prompt + "\n\n" + "="*80 + "\n" + "IMAGE ANALYSIS REQUIRED - READ CAREFULLY" + "\n" + "="*80 + "\n\n" +
-                    "AN IMAGE HAS BEEN UPLOADED. You MUST analyze it before responding.\n\n" +
-                    "STEP 1: ANALYZE THE IMAGE\n" +
-                    "- Look at the image carefully\n" +
-                    "- Identify the DOMINANT leaf color (e.g., green, red, orange, yellow, brown)\n" +
-                    "- Identify the DOMINANT trunk/bark color (e.g., brown, gray, dark brown)\n" +
-                    "- Note the overall shape (tall, short, wide, narrow, bushy, sparse)\n" +
-                    "- Note any distinctive features (autumn colors, coniferous, deciduous, etc.)\n\n" +
-                    "STEP 2: CONVERT COLORS TO HEX\n" +
-                    "Common color conversions:\n" +
-                    "- Green leaves: '#228B22' (forest green), '#2d5016' (dark green), '#4BBB6D' (bright green)\n" +
-                    "- Red/Autumn leaves: '#8B0000' (dark red), '#CD5C5C' (Indian red), '#DC143C' (crimson), '#A52A2A' (brown red)\n" +
-                    "- Orange/Autumn leaves: '#FF8C00' (dark orange), '#FF6347' (tomato), '#FF4500' (orange red)\n" +
-                    "- Yellow/Autumn leaves: '#FFD700' (gold), '#FFA500' (orange), '#DAA520' (goldenrod)\n" +
-                    "- Brown trunks: '#8b4513' (saddle brown), '#654321' (dark brown), '#A0522D' (sienna)\n" +
-                    "- Gray trunks: '#808080' (gray), '#696969' (dim gray), '#2F4F4F' (dark slate gray)\n\n" +
-                    "STEP 3: BUILD THE RESPONSE\n" +
-                    "You MUST use \"set\" with an ARRAY of ALL existing trees.\n" +
-                    "For EACH tree in the existing trees list above:\n" +
-                    "1. Copy ALL original properties (type, position, scale, rotation, leafless)\n" +
-                    "2. ADD \"leaf_color\" field with hex color from image analysis\n" +
-                    "3. ADD \"trunk_color\" field with hex color from image analysis\n" +
-                    "4. If the image shows autumn/red/orange/yellow leaves, use those colors\n" +
-                    "5. If the image shows green leaves, use green shades\n\n" +
-                    "EXAMPLE RESPONSE:\n" +
-                    "{\n" +
-                    "  \"set\": {\n" +
-                    "    \"trees\": [\n" +
-                    "      {\n" +
-                    "        \"type\": \"oak\",\n" +
-                    "        \"leafless\": false,\n" +
-                    "        \"position\": {\"x\": -112.94, \"y\": 4.60, \"z\": -27.61},\n" +
-                    "        \"scale\": 2.10,\n" +
-                    "        \"rotation\": 1.93,\n" +
-                    "        \"leaf_color\": \"#8B0000\",\n" +
-                    "        \"trunk_color\": \"#8b4513\"\n" +
-                    "      },\n" +
-                    "      // ... ALL other existing trees with same structure + colors\n" +
-                    "    ]\n" +
-                    "  }\n" +
-                    "}\n\n" +
-                    "CRITICAL RULES:\n" +
-                    "- DO NOT return just a count\n" +
-                    "- DO NOT skip any trees\n" +
-                    "- EVERY tree MUST have leaf_color and trunk_color fields\n" +
-                    "- Use hex format with # prefix (e.g., \"#8B0000\" not 0x8B0000 or 9114624)\n" +
-                    "- If you see red/autumn colors in the image, use red/orange/yellow hex codes\n" +
-                    "- If you see green in the image, use green hex codes"
+                    "text": user_prompt + _IMAGE_ANALYSIS_INSTRUCTIONS
                 }
             ]
         })
@@ -742,7 +1089,7 @@ Player command:
         })
 
     try:
-        response = claude_client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="anthropic/claude-opus-4",
             messages=messages,
             max_tokens=4000,
@@ -807,9 +1154,9 @@ Player command:
             if "tree" in raw.lower():
                 print(f"[VOICE] AI response mentions trees")
         
-        # Try to parse JSON
+        # Try to parse JSON (orjson errors subclass json.JSONDecodeError)
         try:
-            diff = json.loads(raw)
+            diff = orjson.loads(raw)
             print(f"[VOICE] ✓ Successfully parsed JSON")
         except json.JSONDecodeError as e:
             print(f"[VOICE] JSON parsing error: {e}")
@@ -834,7 +1181,7 @@ Player command:
                     raw = raw[first_brace:json_end]
                     print(f"[VOICE] Extracted JSON object (positions {first_brace} to {json_end})")
                     try:
-                        diff = json.loads(raw)
+                        diff = orjson.loads(raw)
                         print(f"[VOICE] ✓ Successfully parsed extracted JSON")
                     except json.JSONDecodeError as e2:
                         print(f"[VOICE] Still failed to parse: {e2}")
@@ -865,57 +1212,14 @@ Player command:
                 all_trees = diff["add"]["trees"]
                 trees_source = "add"
             
-            # Check if any trees are missing colors
-            if all_trees:
-                trees_missing_colors = [t for t in all_trees if "leaf_color" not in t or "trunk_color" not in t]
-                if trees_missing_colors:
-                    print(f"[VOICE] UNIVERSAL FALLBACK: {len(trees_missing_colors)} trees missing colors in {trees_source} operation, adding colors...")
-                    command_lower = command.lower()
-                    leaf_color = "#228B22"  # Default forest green
-                    trunk_color = "#8b4513"  # Default brown
-                    
-                    # AUTUMN/RED/ORANGE/YELLOW COLORS (highest priority)
-                    if any(word in command_lower for word in ["red", "autumn", "fall", "orange", "crimson", "scarlet"]):
-                        if "red" in command_lower or "crimson" in command_lower or "scarlet" in command_lower:
-                            leaf_color = "#8B0000"  # Dark red
-                        elif "orange" in command_lower:
-                            leaf_color = "#FF8C00"  # Dark orange
-                        elif "yellow" in command_lower or "gold" in command_lower:
-                            leaf_color = "#FFD700"  # Gold
-                        else:
-                            leaf_color = "#CD5C5C"  # Indian red (autumn red)
-                    # GREEN COLORS
-                    elif "green" in command_lower:
-                        if "dark" in command_lower:
-                            leaf_color = "#1a3d0a"  # Dark green
-                        elif "bright" in command_lower or "light" in command_lower:
-                            leaf_color = "#4BBB6D"  # Bright green
-                        else:
-                            leaf_color = "#228B22"  # Forest green
-                    elif "bushy" in command_lower or "busy" in command_lower:
-                        leaf_color = "#228B22"  # Forest green for bushy
-                    
-                    if "no white" in command_lower or "no snow" in command_lower:
-                        if "red" not in command_lower and "autumn" not in command_lower:
-                            leaf_color = "#228B22"  # Solid green, no white parts
-                    
-                    # Trunk color detection
-                    if "gray" in command_lower or "grey" in command_lower:
-                        trunk_color = "#808080"  # Gray
-                    elif "dark" in command_lower and "brown" in command_lower:
-                        trunk_color = "#654321"  # Dark brown
-                    elif "brown" in command_lower:
-                        trunk_color = "#8b4513"  # Saddle brown
-                    
-                    # Add colors to ALL trees missing them
-                    for tree in all_trees:
-                        if "leaf_color" not in tree:
-                            tree["leaf_color"] = leaf_color
-                        if "trunk_color" not in tree:
-                            tree["trunk_color"] = trunk_color
-                    
-                    print(f"[VOICE] ✓ UNIVERSAL FALLBACK: Added colors to all {len(all_trees)} trees: leaf_color={leaf_color}, trunk_color={trunk_color}")
-                    print(f"[VOICE] Sample tree after universal fallback: {json.dumps(all_trees[0], indent=2)}")
+            # Check if any trees are missing colors - stops at the first one, and the keyword
+            # scan below is skipped entirely when the model already coloured every tree
+            if any("leaf_color" not in t or "trunk_color" not in t for t in all_trees):
+                print(f"[VOICE] UNIVERSAL FALLBACK: trees missing colors in {trees_source} operation, adding colors...")
+                leaf_color, trunk_color = _apply_fallback_colors(all_trees, command_lower)
+                print(f"[VOICE] ✓ UNIVERSAL FALLBACK: Added colors to all {len(all_trees)} trees: leaf_color={leaf_color}, trunk_color={trunk_color}")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("[VOICE] Sample tree after universal fallback: %s", json.dumps(all_trees[0], indent=2))
         
         # Debug: Check if trees have color parameters
         if diff.get("set", {}).get("trees"):
@@ -923,60 +1227,19 @@ Player command:
             trees_with_colors = [t for t in trees_list if "leaf_color" in t or "trunk_color" in t]
             print(f"[VOICE] SET operation: Found {len(trees_with_colors)} trees with color parameters out of {len(trees_list)} total")
             if trees_with_colors:
-                print(f"[VOICE] Sample tree with colors: {json.dumps(trees_with_colors[0], indent=2)}")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("[VOICE] Sample tree with colors: %s", json.dumps(trees_with_colors[0], indent=2))
             else:
-                print(f"[VOICE] WARNING: No color parameters found in set trees! Sample tree: {json.dumps(trees_list[0] if trees_list else {}, indent=2)}")
+                print(f"[VOICE] WARNING: No color parameters found in set trees!")
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("[VOICE] Sample tree: %s", json.dumps(trees_list[0] if trees_list else {}, indent=2))
                 # FALLBACK: If image was provided but AI didn't add colors, extract from command and add them
                 if image_data and trees_list:
                     print(f"[VOICE] FALLBACK: AI didn't add colors, extracting from command text...")
-                    # Extract color hints from command
-                    command_lower = command.lower()
-                    leaf_color = "#228B22"  # Default forest green
-                    trunk_color = "#8b4513"  # Default brown
-                    
-                    # AUTUMN/RED/ORANGE/YELLOW COLORS (highest priority)
-                    if any(word in command_lower for word in ["red", "autumn", "fall", "orange", "crimson", "scarlet"]):
-                        if "red" in command_lower or "crimson" in command_lower or "scarlet" in command_lower:
-                            leaf_color = "#8B0000"  # Dark red
-                        elif "orange" in command_lower:
-                            leaf_color = "#FF8C00"  # Dark orange
-                        elif "yellow" in command_lower or "gold" in command_lower:
-                            leaf_color = "#FFD700"  # Gold
-                        else:
-                            # Generic autumn - use red-orange
-                            leaf_color = "#CD5C5C"  # Indian red (autumn red)
-                    # GREEN COLORS
-                    elif "green" in command_lower:
-                        if "dark" in command_lower:
-                            leaf_color = "#1a3d0a"  # Dark green
-                        elif "bright" in command_lower or "light" in command_lower:
-                            leaf_color = "#4BBB6D"  # Bright green
-                        else:
-                            leaf_color = "#228B22"  # Forest green
-                    # BUSHY/BUSY (typo handling)
-                    elif "bushy" in command_lower or "busy" in command_lower:
-                        leaf_color = "#228B22"  # Forest green for bushy
-                    
-                    # Check for "no white" or "no snow" - means fully green
-                    if "no white" in command_lower or "no snow" in command_lower and "red" not in command_lower and "autumn" not in command_lower:
-                        leaf_color = "#228B22"  # Solid green, no white parts
-                    
-                    # Trunk color detection
-                    if "gray" in command_lower or "grey" in command_lower:
-                        trunk_color = "#808080"  # Gray
-                    elif "dark" in command_lower and "brown" in command_lower:
-                        trunk_color = "#654321"  # Dark brown
-                    elif "brown" in command_lower:
-                        trunk_color = "#8b4513"  # Saddle brown
-                    
-                    # Add colors to ALL trees
-                    for tree in trees_list:
-                        if "leaf_color" not in tree:
-                            tree["leaf_color"] = leaf_color
-                        if "trunk_color" not in tree:
-                            tree["trunk_color"] = trunk_color
+                    leaf_color, trunk_color = _apply_fallback_colors(trees_list, command_lower)
                     print(f"[VOICE] ✓ Added fallback colors to {len(trees_list)} trees: leaf_color={leaf_color}, trunk_color={trunk_color}")
-                    print(f"[VOICE] Sample tree after fallback: {json.dumps(trees_list[0], indent=2)}")
+                    if log.isEnabledFor(logging.DEBUG):
+                        log.debug("[VOICE] Sample tree after fallback: %s", json.dumps(trees_list[0], indent=2))
         
         if diff.get("add", {}).get("trees"):
             trees_list = diff["add"]["trees"]
@@ -985,67 +1248,25 @@ Player command:
             # FALLBACK: If image provided but no colors in added trees
             if image_data and trees_list and len(trees_with_colors) == 0:
                 print(f"[VOICE] FALLBACK: Adding colors to new trees based on command...")
-                command_lower = command.lower()
-                leaf_color = "#228B22"  # Default forest green
-                trunk_color = "#8b4513"  # Default brown
-                
-                # AUTUMN/RED/ORANGE/YELLOW COLORS (highest priority)
-                if any(word in command_lower for word in ["red", "autumn", "fall", "orange", "crimson", "scarlet"]):
-                    if "red" in command_lower or "crimson" in command_lower or "scarlet" in command_lower:
-                        leaf_color = "#8B0000"  # Dark red
-                    elif "orange" in command_lower:
-                        leaf_color = "#FF8C00"  # Dark orange
-                    elif "yellow" in command_lower or "gold" in command_lower:
-                        leaf_color = "#FFD700"  # Gold
-                    else:
-                        leaf_color = "#CD5C5C"  # Indian red (autumn red)
-                # GREEN COLORS
-                elif "green" in command_lower:
-                    if "dark" in command_lower:
-                        leaf_color = "#1a3d0a"
-                    elif "bright" in command_lower or "light" in command_lower:
-                        leaf_color = "#4BBB6D"
-                    else:
-                        leaf_color = "#228B22"
-                elif "bushy" in command_lower or "busy" in command_lower:
-                    leaf_color = "#228B22"
-                
-                if "no white" in command_lower or "no snow" in command_lower and "red" not in command_lower and "autumn" not in command_lower:
-                    leaf_color = "#228B22"
-                
-                # Trunk color detection
-                if "gray" in command_lower or "grey" in command_lower:
-                    trunk_color = "#808080"
-                elif "dark" in command_lower and "brown" in command_lower:
-                    trunk_color = "#654321"
-                elif "brown" in command_lower:
-                    trunk_color = "#8b4513"
-                
-                for tree in trees_list:
-                    if "leaf_color" not in tree:
-                        tree["leaf_color"] = leaf_color
-                    if "trunk_color" not in tree:
-                        tree["trunk_color"] = trunk_color
+                leaf_color, trunk_color = _apply_fallback_colors(trees_list, command_lower)
                 print(f"[VOICE] ✓ Added fallback colors to {len(trees_list)} new trees: leaf_color={leaf_color}, trunk_color={trunk_color}")
         
         # Log the entire diff structure for debugging (truncated if too long)
-        diff_str = json.dumps(diff, indent=2)
-        if len(diff_str) > 2000:
-            print(f"[VOICE] Full diff structure (truncated): {diff_str[:2000]}...")
-        else:
-            print(f"[VOICE] Full diff structure: {diff_str}")
+        if log.isEnabledFor(logging.DEBUG):
+            diff_str, truncated = _dumps_capped(diff, 2000)
+            if truncated:
+                log.debug("[VOICE] Full diff structure (truncated): %s...", diff_str)
+            else:
+                log.debug("[VOICE] Full diff structure: %s", diff_str)
         
         # Validate removals - check if AI is removing more than requested
         remove_ops = diff.get("remove", {})
         if remove_ops:
             # Check if command contains "all" and validate removals match
-            command_lower = command.lower()
             if "remove all" in command_lower or "delete all" in command_lower:
                 # Extract the structure type from command
-                structure_types_in_command = []
-                for struct_type in ["trees", "houses", "skyscrapers", "buildings", "rocks", "peaks", "street_lamps", "enemies"]:
-                    if struct_type in command_lower:
-                        structure_types_in_command.append(struct_type)
+                matched = _scan_keywords(command_lower)
+                structure_types_in_command = [t for t in _STRUCT_TYPES if t in matched]
                 
                 # Warn if AI is removing types not mentioned in command
                 for removed_type in remove_ops.keys():
@@ -1120,6 +1341,20 @@ Player command:
             "message": str(e)
         }
 
+def _partition_buildings(buildings: list) -> Tuple[list, list]:
+    """Split buildings into (skyscrapers, houses) in a single pass, preserving order."""
+    skyscrapers = []
+    houses = []
+    add_skyscraper = skyscrapers.append
+    add_house = houses.append
+    for building in buildings:
+        if building.get("type") == "skyscraper":
+            add_skyscraper(building)
+        else:
+            add_house(building)
+    return skyscrapers, houses
+
+
 def merge_world(current_world: Dict, diff: Dict) -> Dict:
     """
     Merge a 'diff' dictionary from the AI into the current world safely.
@@ -1151,46 +1386,54 @@ def merge_world(current_world: Dict, diff: Dict) -> Dict:
         if key in diff_world:
             current_world["world"][key] = diff_world[key]
 
+    # Skyscraper/house split of the buildings list - partitioned at most once per merge and trimmed
+    # in place by the branches below. (Not stored on the world: it round-trips through the client.)
+    building_groups = None
+
     # Handle REMOVALS (reduce counts)
     remove_ops = diff.get("remove", {})
     for struct_type, count in remove_ops.items():
         if count > 0:
             if struct_type == "enemies":
-                current_enemies = current_world["combat"].get("enemies", [])
+                current_enemies = current_world["combat"].setdefault("enemies", [])
                 new_count = max(0, len(current_enemies) - count)
-                current_world["combat"]["enemies"] = current_enemies[:new_count]
+                del current_enemies[new_count:]
                 current_world["combat"]["enemy_count"] = new_count
                 print(f"[MERGE] Removed {count} enemies, now {new_count} total")
             elif struct_type == "skyscrapers":
-                # Filter buildings to remove only skyscrapers
-                current_buildings = current_world["structures"].get("buildings", [])
-                skyscrapers = [b for b in current_buildings if b.get("type") == "skyscraper"]
-                houses = [b for b in current_buildings if b.get("type") != "skyscraper"]
+                # Filter buildings to remove only skyscrapers (the list is rebuilt in place)
+                current_buildings = current_world["structures"].setdefault("buildings", [])
+                if building_groups is None:
+                    building_groups = _partition_buildings(current_buildings)
+                skyscrapers, houses = building_groups
                 # If count is 999 or greater than current count, remove all skyscrapers
                 if count >= 999 or count >= len(skyscrapers):
                     removed = len(skyscrapers)
-                    remaining_skyscrapers = []
                 else:
                     removed = count
-                    remaining_skyscrapers = skyscrapers[removed:]
-                current_world["structures"]["buildings"] = houses + remaining_skyscrapers
-                print(f"[MERGE] Removed {removed} skyscrapers, {len(remaining_skyscrapers)} skyscrapers remaining")
+                del skyscrapers[:removed]
+                current_buildings.clear()
+                current_buildings.extend(houses)
+                current_buildings.extend(skyscrapers)
+                print(f"[MERGE] Removed {removed} skyscrapers, {len(skyscrapers)} skyscrapers remaining")
             elif struct_type == "houses":
-                # Filter buildings to remove only houses
-                current_buildings = current_world["structures"].get("buildings", [])
-                skyscrapers = [b for b in current_buildings if b.get("type") == "skyscraper"]
-                houses = [b for b in current_buildings if b.get("type") != "skyscraper"]
+                # Filter buildings to remove only houses (the list is rebuilt in place)
+                current_buildings = current_world["structures"].setdefault("buildings", [])
+                if building_groups is None:
+                    building_groups = _partition_buildings(current_buildings)
+                skyscrapers, houses = building_groups
                 # If count is 999 or greater than current count, remove all houses
                 if count >= 999 or count >= len(houses):
                     removed = len(houses)
-                    remaining_houses = []
                 else:
                     removed = count
-                    remaining_houses = houses[removed:]
-                current_world["structures"]["buildings"] = skyscrapers + remaining_houses
-                print(f"[MERGE] Removed {removed} houses, {len(remaining_houses)} houses remaining")
+                del houses[:removed]
+                current_buildings.clear()
+                current_buildings.extend(skyscrapers)
+                current_buildings.extend(houses)
+                print(f"[MERGE] Removed {removed} houses, {len(houses)} houses remaining")
             else:
-                current_list = current_world["structures"].get(struct_type, [])
+                current_list = current_world["structures"].setdefault(struct_type, [])
                 current_count = len(current_list)
                 # If count is 999 or greater than current count, remove all
                 if count >= 999 or count >= current_count:
@@ -1199,7 +1442,9 @@ def merge_world(current_world: Dict, diff: Dict) -> Dict:
                 else:
                     new_count = max(0, current_count - count)
                     removed = count
-                current_world["structures"][struct_type] = current_list[:new_count]
+                del current_list[new_count:]
+                if struct_type == "buildings":
+                    building_groups = None
                 print(f"[MERGE] Removed {removed} {struct_type}, now {new_count} total")
 
     # Handle SET operations (set exact counts OR replace with new objects)
@@ -1218,6 +1463,8 @@ def merge_world(current_world: Dict, diff: Dict) -> Dict:
                     print(f"[MERGE] Set enemies: replaced all with {len(target_value)} new enemies")
                 else:
                     current_world["structures"][struct_type] = target_value
+                    if struct_type == "buildings":
+                        building_groups = None
                     print(f"[MERGE] Set {struct_type}: replaced all with {len(target_value)} new objects")
             else:
                 # It's a number - set exact count (original behavior)
@@ -1226,28 +1473,40 @@ def merge_world(current_world: Dict, diff: Dict) -> Dict:
                     current_enemies = current_world["combat"].get("enemies", [])
                     current_count = len(current_enemies)
                     if target_count < current_count:
-                        current_world["combat"]["enemies"] = current_enemies[:target_count]
+                        del current_enemies[target_count:]
                         current_world["combat"]["enemy_count"] = target_count
                         print(f"[MERGE] Set enemies to {target_count} (removed {current_count - target_count})")
                 elif struct_type == "skyscrapers":
                     # Set exact number of skyscrapers
-                    current_buildings = current_world["structures"].get("buildings", [])
-                    skyscrapers = [b for b in current_buildings if b.get("type") == "skyscraper"]
-                    houses = [b for b in current_buildings if b.get("type") != "skyscraper"]
-                    current_world["structures"]["buildings"] = houses + skyscrapers[:target_count]
-                    print(f"[MERGE] Set skyscrapers to {target_count} (removed {max(0, len(skyscrapers) - target_count)})")
+                    current_buildings = current_world["structures"].setdefault("buildings", [])
+                    if building_groups is None:
+                        building_groups = _partition_buildings(current_buildings)
+                    skyscrapers, houses = building_groups
+                    removed = max(0, len(skyscrapers) - target_count)
+                    del skyscrapers[target_count:]
+                    current_buildings.clear()
+                    current_buildings.extend(houses)
+                    current_buildings.extend(skyscrapers)
+                    print(f"[MERGE] Set skyscrapers to {target_count} (removed {removed})")
                 elif struct_type == "houses":
                     # Set exact number of houses
-                    current_buildings = current_world["structures"].get("buildings", [])
-                    skyscrapers = [b for b in current_buildings if b.get("type") == "skyscraper"]
-                    houses = [b for b in current_buildings if b.get("type") != "skyscraper"]
-                    current_world["structures"]["buildings"] = skyscrapers + houses[:target_count]
-                    print(f"[MERGE] Set houses to {target_count} (removed {max(0, len(houses) - target_count)})")
+                    current_buildings = current_world["structures"].setdefault("buildings", [])
+                    if building_groups is None:
+                        building_groups = _partition_buildings(current_buildings)
+                    skyscrapers, houses = building_groups
+                    removed = max(0, len(houses) - target_count)
+                    del houses[target_count:]
+                    current_buildings.clear()
+                    current_buildings.extend(skyscrapers)
+                    current_buildings.extend(houses)
+                    print(f"[MERGE] Set houses to {target_count} (removed {removed})")
                 else:
                     current_list = current_world["structures"].get(struct_type, [])
                     current_count = len(current_list)
                     if target_count < current_count:
-                        current_world["structures"][struct_type] = current_list[:target_count]
+                        del current_list[target_count:]
+                        if struct_type == "buildings":
+                            building_groups = None
                         print(f"[MERGE] Set {struct_type} to {target_count} (removed {current_count - target_count})")
 
     # Handle ADDITIONS (from "add" field)
@@ -1300,12 +1559,14 @@ def merge_world(current_world: Dict, diff: Dict) -> Dict:
         "combat": current_world["combat"]
     }
     
-    # Log if trees are missing colors (for debugging)
-    if response["structures"].get("trees"):
-        trees_with_colors = [t for t in response["structures"]["trees"] if "leaf_color" in t and "trunk_color" in t]
-        if len(trees_with_colors) < len(response["structures"]["trees"]):
-            print(f"[MERGE] WARNING: {len(response['structures']['trees']) - len(trees_with_colors)} trees missing colors in final response!")
-            print(f"[MERGE] This should not happen if fallback ran correctly. Check backend logs above.")
+    # Log if trees are missing colors (for debugging) - stops at the first uncoloured tree
+    missing = next(
+        (t for t in response["structures"].get("trees") or () if "leaf_color" not in t or "trunk_color" not in t),
+        None
+    )
+    if missing is not None:
+        print(f"[MERGE] WARNING: trees missing colors in final response!")
+        print(f"[MERGE] This should not happen if fallback ran correctly. Check backend logs above.")
     
     # Only include world.lighting_config if lighting was actually changed
     lighting_changed = diff.get("lighting") is not None
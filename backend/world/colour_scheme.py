@@ -2,19 +2,51 @@
 Color Scheme System for Landscape Elements
 Maps color palette to specific landscape elements with aesthetic variations
 """
-import colorsys
+from functools import lru_cache
 from typing import List, Dict, Tuple, Optional
 
 
+@lru_cache(maxsize=512)
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
-    """Convert hex color to RGB tuple."""
+    """Convert hex color to RGB tuple (cached - palettes repeat the same strings)."""
     hex_color = hex_color.lstrip('#')
+    if len(hex_color) == 6:
+        # One parse, then split the channels out with shifts
+        v = int(hex_color, 16)
+        return (v >> 16) & 0xff, (v >> 8) & 0xff, v & 0xff
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
+# Two-digit hex string for every channel value
+_HEX = [format(i, '02x') for i in range(256)]
+
+
 def rgb_to_hex(rgb: Tuple[int, int, int]) -> str:
-    """Convert RGB tuple to hex color."""
-    return f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
+    """Convert RGB tuple (or list) of 0-255 ints to hex color."""
+    return _rgb_to_hex(*rgb)
+
+
+@lru_cache(maxsize=2048)
+def _rgb_to_hex(r: int, g: int, b: int) -> str:
+    """Cached by channel so callers may pass unhashable sequences to rgb_to_hex; channels are clamped to 0-255."""
+    return "#" + _HEX[min(max(r, 0), 255)] + _HEX[min(max(g, 0), 255)] + _HEX[min(max(b, 0), 255)]
+
+
+_ONE_THIRD = 1.0 / 3.0
+_ONE_SIXTH = 1.0 / 6.0
+_TWO_THIRD = 2.0 / 3.0
+
+
+def _hue_channel(lo: float, hi: float, hue: float) -> float:
+    """One RGB channel from the min/max channel values and its hue offset (colorsys._v)."""
+    hue = hue % 1.0
+    if hue < _ONE_SIXTH:
+        return lo + (hi - lo) * hue * 6.0
+    if hue < 0.5:
+        return hi
+    if hue < _TWO_THIRD:
+        return lo + (hi - lo) * (_TWO_THIRD - hue) * 6.0
+    return lo
 
 
 def adjust_shade(rgb: Tuple[int, int, int], lighten: float = 0.0, darken: float = 0.0, 
@@ -32,9 +64,28 @@ def adjust_shade(rgb: Tuple[int, int, int], lighten: float = 0.0, darken: float
     Returns:
         Adjusted RGB tuple
     """
-    # Convert to HLS for easier manipulation (note: colorsys uses HLS, not HSL)
-    r, g, b = [c / 255.0 for c in rgb]
-    h, l, s = colorsys.rgb_to_hls(r, g, b)  # HLS order: hue, lightness, saturation
+    # The colorsys HLS round-trip inlined, operation for operation, so results stay identical
+    # to colorsys.rgb_to_hls/hls_to_rgb without the two calls and their tuple packing per shade
+    r, g, b = rgb[0] / 255.0, rgb[1] / 255.0, rgb[2] / 255.0
+    mx = max(r, g, b)
+    mn = min(r, g, b)
+    l = (mx + mn) / 2.0
+    if mn == mx:
+        # Greys have hue 0 in colorsys, so saturating one tints it towards red
+        h = s = 0.0
+    else:
+        delta = mx - mn
+        s = delta / (mx + mn) if l <= 0.5 else delta / (2.0 - mx - mn)
+        rc = (mx - r) / delta
+        gc = (mx - g) / delta
+        bc = (mx - b) / delta
+        if r == mx:
+            h = bc - gc
+        elif g == mx:
+            h = 2.0 + rc - bc
+        else:
+            h = 4.0 + gc - rc
+        h = (h / 6.0) % 1.0
     
     # Adjust lightness
     if lighten > 0:
@@ -48,9 +99,49 @@ def adjust_shade(rgb: Tuple[int, int, int], lighten: float = 0.0, darken: float
     if desaturate > 0:
         s = max(0.0, s - desaturate * s)
     
-    # Convert back to RGB
-    r, g, b = colorsys.hls_to_rgb(h, l, s)
-    return (int(r * 255), int(g * 255), int(b * 255))
+    if s == 0.0:
+        grey = int(l * 255)
+        return (grey, grey, grey)
+    
+    # Max/min channel values for the adjusted L and S, then each channel from its hue offset
+    hi = l * (1.0 + s) if l <= 0.5 else l + s - (l * s)
+    lo = 2.0 * l - hi
+    return (int(_hue_channel(lo, hi, h + _ONE_THIRD) * 255),
+            int(_hue_channel(lo, hi, h) * 255),
+            int(_hue_channel(lo, hi, h - _ONE_THIRD) * 255))
+
+
+# Named adjust_shade presets used by the palette assignment
+_SHADE_PRESETS: Dict[str, Dict[str, float]] = {
+    "ground_light": {"lighten": 0.15, "saturate": 0.1},
+    "ground_dark": {"darken": 0.15, "desaturate": 0.1},
+    "leaves": {"saturate": 0.2},
+    "leaves_light": {"lighten": 0.2, "saturate": 0.15},
+    "leaves_dark": {"darken": 0.2, "saturate": 0.1},
+    "trunk": {"darken": 0.5, "desaturate": 0.4},
+    "building_from_tree": {"lighten": 0.3, "desaturate": 0.2},
+    "building_from_ground": {"lighten": 0.2, "desaturate": 0.1},
+    "mountain_from_ground": {"darken": 0.2, "desaturate": 0.2},
+    "rock": {"darken": 0.1, "desaturate": 0.15},
+    "rock_from_mountain": {"darken": 0.15, "desaturate": 0.2},
+    "sky": {"lighten": 0.6, "saturate": 0.1},
+    "sky_from_building": {"lighten": 0.7, "saturate": 0.15},
+    "sky_from_ground": {"lighten": 0.7, "saturate": 0.2},
+    "street_lamp": {"saturate": 0.3, "lighten": 0.2},
+    "lighten_20": {"lighten": 0.2},
+    "lighten_25": {"lighten": 0.25},
+    "lighten_30": {"lighten": 0.3},
+    "lighten_40": {"lighten": 0.4},
+    "lighten_50": {"lighten": 0.5},
+    "darken_15": {"darken": 0.15},
+    "darken_20": {"darken": 0.2},
+}
+
+
+@lru_cache(maxsize=4096)
+def _variant(hex_color: str, preset: str) -> str:
+    """Hex color with a named shade preset applied (cached across palettes)."""
+    return rgb_to_hex(adjust_shade(hex_to_rgb(hex_color), **_SHADE_PRESETS[preset]))
 
 
 def assign_palette_to_elements(color_palette: List[str]) -> Dict[str, str]:
@@ -76,87 +167,119 @@ def assign_palette_to_elements(color_palette: List[str]) -> Dict[str, str]:
     if not color_palette or not isinstance(color_palette, list) or len(color_palette) == 0:
         return {}
     
+    # Copy so callers can't mutate the cached assignments
+    palette = tuple(color_palette)
+    if len(palette) >= 5:
+        # Only the first five colors are used, so key the fast path on those
+        return dict(_assign5(palette[:5]))
+    return dict(_assign_cached(palette))
+
+
+@lru_cache(maxsize=64)
+def _assign5(color_palette: Tuple[str, ...]) -> Dict[str, str]:
+    """Assignments for a full (5+ color) palette - the usual case - without the fallback branches."""
+    ground, tree, building, mountain, accent = color_palette
+    ground = rgb_to_hex(hex_to_rgb(ground))
+    building = rgb_to_hex(hex_to_rgb(building))
+    mountain = rgb_to_hex(hex_to_rgb(mountain))
+    return {
+        "ground": ground,
+        "ground_light": _variant(ground, "ground_light"),
+        "ground_dark": _variant(ground, "ground_dark"),
+        "tree_leaves": _variant(tree, "leaves"),
+        "tree_leaves_light": _variant(tree, "leaves_light"),
+        "tree_leaves_dark": _variant(tree, "leaves_dark"),
+        "tree_trunk": _variant(tree, "trunk"),
+        "building": building,
+        "building_light": _variant(building, "lighten_25"),
+        "building_dark": _variant(building, "darken_15"),
+        "mountain": mountain,
+        "mountain_light": _variant(mountain, "lighten_30"),
+        "mountain_dark": _variant(mountain, "darken_20"),
+        "rock": _variant(accent, "rock"),
+        "sky": _variant(accent, "sky"),
+        "sky_dark": _variant(accent, "lighten_40"),
+        "street_lamp": _variant(tree, "street_lamp"),
+    }
+
+
+@lru_cache(maxsize=64)
+def _assign_cached(color_palette: Tuple[str, ...]) -> Dict[str, str]:
+    """Build the element assignments for a palette; cached since the same palette is reused across renders."""
     assignments = {}
     
     # Ground/Terrain (first color - base, use as-is)
-    ground_base = hex_to_rgb(color_palette[0])
-    assignments["ground"] = rgb_to_hex(ground_base)
-    assignments["ground_light"] = rgb_to_hex(adjust_shade(ground_base, lighten=0.15, saturate=0.1))
-    assignments["ground_dark"] = rgb_to_hex(adjust_shade(ground_base, darken=0.15, desaturate=0.1))
+    ground = rgb_to_hex(hex_to_rgb(color_palette[0]))
+    assignments["ground"] = ground
+    assignments["ground_light"] = _variant(ground, "ground_light")
+    assignments["ground_dark"] = _variant(ground, "ground_dark")
     
     # Trees (second color - or use first if only one color)
     tree_color_idx = min(1, len(color_palette) - 1)
-    tree_base = hex_to_rgb(color_palette[tree_color_idx])
-    assignments["tree_leaves"] = rgb_to_hex(adjust_shade(tree_base, saturate=0.2))  # More vibrant for leaves
-    assignments["tree_leaves_light"] = rgb_to_hex(adjust_shade(tree_base, lighten=0.2, saturate=0.15))
-    assignments["tree_leaves_dark"] = rgb_to_hex(adjust_shade(tree_base, darken=0.2, saturate=0.1))
+    tree = color_palette[tree_color_idx]
+    assignments["tree_leaves"] = _variant(tree, "leaves")  # More vibrant for leaves
+    assignments["tree_leaves_light"] = _variant(tree, "leaves_light")
+    assignments["tree_leaves_dark"] = _variant(tree, "leaves_dark")
     
     # Tree trunks (darker, desaturated version of tree color)
-    assignments["tree_trunk"] = rgb_to_hex(adjust_shade(tree_base, darken=0.5, desaturate=0.4))
+    assignments["tree_trunk"] = _variant(tree, "trunk")
     
     # Buildings (third color - or use second if only two colors)
     if len(color_palette) >= 3:
-        building_base = hex_to_rgb(color_palette[2])
-        assignments["building"] = rgb_to_hex(building_base)
-        assignments["building_light"] = rgb_to_hex(adjust_shade(building_base, lighten=0.25))
-        assignments["building_dark"] = rgb_to_hex(adjust_shade(building_base, darken=0.15))
+        building = rgb_to_hex(hex_to_rgb(color_palette[2]))
+        assignments["building"] = building
+        assignments["building_light"] = _variant(building, "lighten_25")
+        assignments["building_dark"] = _variant(building, "darken_15")
     elif len(color_palette) >= 2:
         # Use tree color but lighter/desaturated for buildings
-        building_base = adjust_shade(tree_base, lighten=0.3, desaturate=0.2)
-        assignments["building"] = rgb_to_hex(building_base)
-        assignments["building_light"] = rgb_to_hex(adjust_shade(building_base, lighten=0.2))
-        assignments["building_dark"] = rgb_to_hex(adjust_shade(building_base, darken=0.15))
+        building = _variant(tree, "building_from_tree")
+        assignments["building"] = building
+        assignments["building_light"] = _variant(building, "lighten_20")
+        assignments["building_dark"] = _variant(building, "darken_15")
     else:
         # Use ground color with more variation
-        building_base = adjust_shade(ground_base, lighten=0.2, desaturate=0.1)
-        assignments["building"] = rgb_to_hex(building_base)
-        assignments["building_light"] = rgb_to_hex(adjust_shade(building_base, lighten=0.25))
-        assignments["building_dark"] = rgb_to_hex(adjust_shade(building_base, darken=0.15))
+        building = _variant(ground, "building_from_ground")
+        assignments["building"] = building
+        assignments["building_light"] = _variant(building, "lighten_25")
+        assignments["building_dark"] = _variant(building, "darken_15")
     
     # Mountains/Peaks (fourth color - or use first if only one)
     if len(color_palette) >= 4:
-        mountain_base = hex_to_rgb(color_palette[3])
-        assignments["mountain"] = rgb_to_hex(mountain_base)
-        assignments["mountain_light"] = rgb_to_hex(adjust_shade(mountain_base, lighten=0.3))
-        assignments["mountain_dark"] = rgb_to_hex(adjust_shade(mountain_base, darken=0.2))
+        mountain = rgb_to_hex(hex_to_rgb(color_palette[3]))
+        assignments["mountain"] = mountain
+        assignments["mountain_light"] = _variant(mountain, "lighten_30")
+        assignments["mountain_dark"] = _variant(mountain, "darken_20")
     else:
         # Use ground color but darker/desaturated
-        mountain_base = adjust_shade(ground_base, darken=0.2, desaturate=0.2)
-        assignments["mountain"] = rgb_to_hex(mountain_base)
-        assignments["mountain_light"] = rgb_to_hex(adjust_shade(mountain_base, lighten=0.2))
-        assignments["mountain_dark"] = rgb_to_hex(adjust_shade(mountain_base, darken=0.2))
+        mountain = _variant(ground, "mountain_from_ground")
+        assignments["mountain"] = mountain
+        assignments["mountain_light"] = _variant(mountain, "lighten_20")
+        assignments["mountain_dark"] = _variant(mountain, "darken_20")
     
     # Rocks (fifth color - or use mountain if only 4 colors)
     if len(color_palette) >= 5:
-        rock_base = hex_to_rgb(color_palette[4])
-        assignments["rock"] = rgb_to_hex(adjust_shade(rock_base, darken=0.1, desaturate=0.15))
+        assignments["rock"] = _variant(color_palette[4], "rock")
     else:
         # Use mountain color but darker
-        rock_base = adjust_shade(hex_to_rgb(assignments["mountain"]), darken=0.15, desaturate=0.2)
-        assignments["rock"] = rgb_to_hex(rock_base)
+        assignments["rock"] = _variant(mountain, "rock_from_mountain")
     
     # Sky/Background (fifth color - or lightened version of first)
     if len(color_palette) >= 5:
-        sky_base = hex_to_rgb(color_palette[4])
-        assignments["sky"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.6, saturate=0.1))
-        assignments["sky_dark"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.4))
+        assignments["sky"] = _variant(color_palette[4], "sky")
+        assignments["sky_dark"] = _variant(color_palette[4], "lighten_40")
     elif len(color_palette) >= 3:
         # Use building color but very light
-        sky_base = hex_to_rgb(assignments["building"])
-        assignments["sky"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.7, saturate=0.15))
-        assignments["sky_dark"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.5))
+        assignments["sky"] = _variant(building, "sky_from_building")
+        assignments["sky_dark"] = _variant(building, "lighten_50")
     else:
         # Lightened version of ground color
-        sky_base = hex_to_rgb(color_palette[0])
-        assignments["sky"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.7, saturate=0.2))
-        assignments["sky_dark"] = rgb_to_hex(adjust_shade(sky_base, lighten=0.5))
+        assignments["sky"] = _variant(ground, "sky_from_ground")
+        assignments["sky_dark"] = _variant(ground, "lighten_50")
     
     # Street lamps (optional - use a complementary or accent color)
     if len(color_palette) >= 2:
-        lamp_base = hex_to_rgb(color_palette[1])
-        assignments["street_lamp"] = rgb_to_hex(adjust_shade(lamp_base, saturate=0.3, lighten=0.2))
+        assignments["street_lamp"] = _variant(color_palette[1], "street_lamp")
     else:
         assignments["street_lamp"] = "#FFD700"  # Default gold
     
-    print(f"[COLOR SCHEME] Assigned colors to elements: {list(assignments.keys())}")
     return assignments
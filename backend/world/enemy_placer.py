@@ -1,19 +1,113 @@
+import logging
 import random
 import math
-from typing import List, Dict
+import numpy as np
+from typing import List, Dict, Tuple
 from .weapon_config import get_enemy_stats
-from .terrain import get_walkable_points
+from .terrain import get_walkable_points_array
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional - placement falls back to the spatial-hash loop
+    njit = None
+
+# Per-call placement summary is noise during world generation - it only goes to debug logging
+log = logging.getLogger(__name__)
+
+def _too_close_in_grid(grid: Dict[Tuple[int, int], List[Tuple[int, int]]], cell_x: int, cell_z: int,
+                       x: int, z: int, min_distance_sq: float) -> bool:
+    # Cells are at least min_distance wide, so only the 3x3 neighbourhood can hold a close enemy
+    for gx in (cell_x - 1, cell_x, cell_x + 1):
+        for gz in (cell_z - 1, cell_z, cell_z + 1):
+            for ex, ez in grid.get((gx, gz), ()):
+                dx = x - ex
+                dz = z - ez
+                if dx * dx + dz * dz < min_distance_sq:
+                    return True
+    return False
 
-def distance_2d(x1: float, z1: float, x2: float, z2: float) -> float:
-    return math.sqrt((x2 - x1)**2 + (z2 - z1)**2)
 
-def is_too_close_to_others(x: float, z: float, enemies: List[Dict], min_distance: float) -> bool:
-    for enemy in enemies:
-        ex = enemy["position"]["x"]
-        ez = enemy["position"]["z"]
-        if distance_2d(x, z, ex, ez) < min_distance:
-            return True
-    return False
+def _place_core(cand_x, cand_z, grid_size, radius, enemy_count):
+    """
+    Sequential accept/reject loop over candidate grid indices, compiled with numba when available.
+    Works entirely in grid-index space (radius is the minimum enemy spacing in index units), so
+    rejected candidates never need world coordinates. Accepted points are bucketed into cells
+    ceil(radius) indices wide (linked lists through head/link) and each candidate only checks
+    its 3x3 neighbourhood.
+    Numeric-only: returns (indices of accepted candidates, attempts used).
+    """
+    radius_sq = radius * radius
+    cell = max(int(math.ceil(radius)), 1)
+    # +1 offset and padding keep every neighbour of an edge cell inside the grid
+    n_cells = grid_size // cell + 3
+    head = np.full((n_cells, n_cells), -1, dtype=np.int64)
+    link = np.empty(enemy_count, dtype=np.int64)
+    chosen = np.empty(enemy_count, dtype=np.int64)
+    placed_x = np.empty(enemy_count, dtype=np.int64)
+    placed_z = np.empty(enemy_count, dtype=np.int64)
+    n = 0
+    attempts = 0
+
+    for i in range(cand_x.shape[0]):
+        if n >= enemy_count:
+            break
+        attempts += 1
+        x = cand_x[i]
+        z = cand_z[i]
+        cx = x // cell + 1
+        cz = z // cell + 1
+
+        ok = True
+        for gx in range(cx - 1, cx + 2):
+            for gz in range(cz - 1, cz + 2):
+                j = head[gx, gz]
+                while j >= 0:
+                    dx = x - placed_x[j]
+                    dz = z - placed_z[j]
+                    if dx * dx + dz * dz < radius_sq:
+                        ok = False
+                        break
+                    j = link[j]
+                if not ok:
+                    break
+            if not ok:
+                break
+        if ok:
+            chosen[n] = i
+            placed_x[n] = x
+            placed_z[n] = z
+            link[n] = head[cx, cz]
+            head[cx, cz] = n
+            n += 1
+
+    return chosen[:n], attempts
+
+
+if njit is not None:
+    _place_core = njit(cache=True)(_place_core)
+
+
+def _place_core_grid(cand_x, cand_z, grid_size, radius, enemy_count):
+    """Same contract as _place_core, using a dict spatial hash (fallback when numba is missing)."""
+    radius_sq = radius * radius
+    cell = max(math.ceil(radius), 1)
+    grid: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    chosen = []
+    attempts = 0
+
+    for i, (x, z) in enumerate(zip(cand_x.tolist(), cand_z.tolist())):
+        if len(chosen) >= enemy_count:
+            break
+        attempts += 1
+
+        cell_x, cell_z = x // cell, z // cell
+        if _too_close_in_grid(grid, cell_x, cell_z, x, z, radius_sq):
+            continue  # skip, too close to other enemies
+
+        grid.setdefault((cell_x, cell_z), []).append((x, z))
+        chosen.append(i)
+
+    return np.array(chosen, dtype=np.int64), attempts
 
 
 def place_enemies(
@@ -27,11 +121,25 @@ def place_enemies(
 ) -> List[Dict]:
 
     enemy_stats = get_enemy_stats("sentinel")
-    segments = len(heightmap_raw) - 1
+    # Every enemy shares the same type/stat fields; build them once and splat per enemy
+    enemy_template = {
+        "type": "sentinel",
+        "behavior": "patrol",
+        "health": enemy_stats["health"],
+        "max_health": enemy_stats["health"],
+        "damage": enemy_stats["damage"],
+        "speed": enemy_stats["speed"],
+        "detection_radius": enemy_stats["detection_radius"],
+        "attack_radius": enemy_stats["attack_radius"]
+    }
+    # Contiguous arrays: one strided load per height lookup instead of nested list indexing
+    heights = np.asarray(heightmap_raw, dtype=np.float64)
+    mask = np.asarray(placement_mask, dtype=np.uint8)
+    segments = heights.shape[0] - 1
 
     # --- Get all walkable points ---
-    walkable_points = get_walkable_points(placement_mask=placement_mask, radius=1)
-    if not walkable_points:
+    points = get_walkable_points_array(placement_mask=mask, radius=1)
+    if not len(points):
         print("[Enemy Placer] WARNING: No walkable points!")
         return []
 
@@ -39,59 +147,44 @@ def place_enemies(
     player_x_idx = int((player_spawn["x"] + terrain_size / 2) / terrain_size * segments)
     player_z_idx = int((player_spawn["z"] + terrain_size / 2) / terrain_size * segments)
 
-    # --- Filter points far from player ---
-    spawnable_points = [
-        (x_idx, z_idx) for (x_idx, z_idx) in walkable_points
-        if distance_2d(x_idx, z_idx, player_x_idx, player_z_idx) >= min_player_distance
-    ]
+    # --- Filter points far from player (squared distances, whole grid at once) ---
+    dx = points[:, 0] - player_x_idx
+    dz = points[:, 1] - player_z_idx
+    spawnable = points[dx * dx + dz * dz >= min_player_distance * min_player_distance]
 
-    if not spawnable_points:
+    if not len(spawnable):
         print("[Enemy Placer] WARNING: No points far from player! Using all walkable points.")
-        spawnable_points = walkable_points.copy()
-
-    random.shuffle(spawnable_points)
-    enemies = []
-    attempts = 0
-    max_attempts = enemy_count * 50  # more attempts if terrain is sparse
-
-    while len(enemies) < enemy_count and attempts < max_attempts:
-        attempts += 1
-
-        if spawnable_points:
-            x_idx, z_idx = spawnable_points.pop()
-        else:
-            # fallback: pick random walkable point
-            x_idx, z_idx = random.choice(walkable_points)
-
-        world_x = (x_idx / segments) * terrain_size - terrain_size / 2
-        world_z = (z_idx / segments) * terrain_size - terrain_size / 2
-        world_y = heightmap_raw[z_idx][x_idx] * 10 + 0.5
-
-        if is_too_close_to_others(world_x, world_z, enemies, min_enemy_distance):
-            continue  # skip, too close to other enemies
+        spawnable = points
+
+    max_attempts = max(enemy_count, 0) * 50  # more attempts if terrain is sparse
+    # Draw only as many distinct candidates as the loop can use instead of shuffling them all;
+    # once those run out, remaining attempts fall back to random walkable points
+    picks = random.sample(range(len(spawnable)), min(max_attempts, len(spawnable)))
+    fallback = random.choices(range(len(points)), k=max_attempts - len(picks))
+    cand = np.concatenate((spawnable[picks], points[fallback]))
+    cand_x = np.ascontiguousarray(cand[:, 0])
+    cand_z = np.ascontiguousarray(cand[:, 1])
+    grid_size = max(mask.shape)
+    # Minimum enemy spacing in grid-index units (grid spacing is terrain_size / segments)
+    radius = float(min_enemy_distance * segments / terrain_size)
+
+    place = _place_core if njit is not None else _place_core_grid
+    chosen, attempts = place(cand_x, cand_z, grid_size, radius, max(enemy_count, 0))
+
+    # World coordinate of every grid index, looked up instead of recomputed per enemy
+    coord = (np.arange(grid_size) / segments) * terrain_size - terrain_size / 2
+
+    xs = cand_x[chosen]
+    zs = cand_z[chosen]
+    world_xs = coord[xs]
+    world_zs = coord[zs]
+    world_ys = heights[zs, xs] * 10 + 0.5
+
+    enemies = [
+        {"id": i + 1, "position": {"x": x, "y": y, "z": z}, **enemy_template}
+        for i, (x, y, z) in enumerate(zip(world_xs.tolist(), world_ys.tolist(), world_zs.tolist()))
+    ]
 
-        enemies.append({
-            "id": len(enemies) + 1,
-            "position": {"x": float(world_x), "y": float(world_y), "z": float(world_z)},
-            "type": "sentinel",
-            "behavior": "patrol",
-            "health": enemy_stats["health"],
-            "max_health": enemy_stats["health"],
-            "damage": enemy_stats["damage"],
-            "speed": enemy_stats["speed"],
-            "detection_radius": enemy_stats["detection_radius"],
-            "attack_radius": enemy_stats["attack_radius"]
-        })
-
-    # --- Ensure all enemies have positions ---
-    for enemy in enemies:
-        pos = enemy.get("position", {})
-        if "x" not in pos or "z" not in pos:
-            x_idx, z_idx = random.choice(walkable_points)
-            pos["x"] = (x_idx / segments) * terrain_size - terrain_size / 2
-            pos["z"] = (z_idx / segments) * terrain_size - terrain_size / 2
-            pos["y"] = heightmap_raw[z_idx][x_idx] * 10 + 0.5
-            enemy["position"] = pos
-
-    print(f"[Enemy Placer] Placed {len(enemies)}/{enemy_count} enemies (attempts: {attempts})")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("[Enemy Placer] Placed %d/%d enemies (attempts: %d)", len(enemies), enemy_count, attempts)
     return enemies
\ No newline at end of file
@@ -3,260 +3,403 @@ Lighting configuration presets for different times of day and biomes
 Returns Three.js-compatible lighting parameters
 """
 
-def get_lighting_preset(time: str, biome: str = "city") -> dict:
-    """
-    Return lighting configuration for Three.js based on time of day and biome
+import copy
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+
+class _FrozenDict(dict):
+    """Read-only dict for settings shared between presets; copies come back as plain, mutable dicts."""
+    __slots__ = ()
     
-    Args:
-        time: "noon", "sunset", or "night"
-        biome: "arctic", "city", etc.
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared lighting settings are read-only - copy before modifying")
     
-    Returns:
-        dict with ambient, directional, and fog settings
-    """
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
     
-    # Base presets
-    presets = {
-        "noon": {
-            "ambient": {
-                "color": "#ffffff",
-                "intensity": 0.8
-            },
-            "directional": {
-                "color": "#ffffff",
-                "intensity": 0.8,
-                "position": {"x": 50, "y": 100, "z": 50}
-            },
-            "fog": {
-                "color": "#DDEEFF",  # Sky blue
-                "near": 50,
-                "far": 200
-            },
-            "background": "#87CEEB"  # Bright sky blue
-        },
-        
-        "sunset": {
-            "ambient": {
-                "color": "#D85365",  # Soft peachy orange
-                "intensity": 0.5
-            },
-            "directional": {
-                "color": "#D5A29D",  # Gentle warm orange
-                "intensity": 0.9,
-                "position": {"x": 100, "y": 20, "z": 50}  # Low sun angle
-            },
-            "fog": {
-                "color": "#d9a066",  # Muted golden orange
-                "near": 30,
-                "far": 150
-            },
-            "background": "#D85365"
-        },
-        
-        "night": {
-            "ambient": {
-                "color": "#4444ff",  # Cool blue
-                "intensity": 0.2
-            },
-            "directional": {
-                "color": "#6666ff",  # Moonlight blue
-                "intensity": 0.3,
-                "position": {"x": 50, "y": 80, "z": 50}
-            },
-            "fog": {
-                "color": "#001133",  # Dark blue
-                "near": 20,
-                "far": 100
-            },
-            "background": "#001133"
-        }
-    }
+    def __copy__(self):
+        return dict(self)
     
-    # Get base preset
-    config = presets.get(time, presets["noon"]).copy()
-    
-    # Apply biome-specific modifications for arctic/icy/winter environments
-    is_winter = biome.lower() in ["arctic", "winter", "icy"]
-    is_arctic = biome.lower() in ["arctic", "winter", "icy", "snow", "frozen"]
-    is_lava = biome.lower() in ["lava", "volcanic", "volcano", "magma"]
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
     
-    # Arctic cave: bright light from above (simulating cave opening)
-    if is_arctic:
-        # Cave lighting: bright overhead light (like cave opening)
-        config["background"] = "#E0F4FF"  # Bright icy blue (light from cave opening)
-        config["ambient"]["color"] = "#B0E0FF"  # Cool blue ambient
-        config["ambient"]["intensity"] = 0.6  # Moderate brightness
-        config["directional"]["color"] = "#FFFFFF"  # Bright white overhead light
-        config["directional"]["intensity"] = 1.2  # Very bright directional (cave opening)
-        config["directional"]["position"] = {"x": 0, "y": 200, "z": 0}  # Directly overhead
-        config["fog"] = {
-            "color": "#C8E6FF",  # Light blue fog for cave atmosphere
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+# Directional light positions, interned so every preset using one shares a single object
+_POS_HIGH_SUN = _FrozenDict({"x": 50, "y": 100, "z": 50})
+_POS_LOW_SUN = _FrozenDict({"x": 100, "y": 20, "z": 50})
+_POS_MOON = _FrozenDict({"x": 50, "y": 80, "z": 50})
+_POS_OVERHEAD = _FrozenDict({"x": 0, "y": 200, "z": 0})
+_POS_LAVA = _FrozenDict({"x": 30, "y": 80, "z": 30})
+
+
+# Base presets (shared - copy before modifying)
+_BASE_PRESETS = {
+    "noon": {
+        "ambient": {
+            "color": "#ffffff",
+            "intensity": 0.8
+        },
+        "directional": {
+            "color": "#ffffff",
+            "intensity": 0.8,
+            "position": _POS_HIGH_SUN
+        },
+        "fog": {
+            "color": "#DDEEFF",  # Sky blue
             "near": 50,
             "far": 200
-        }
-        # Ensure northern lights are enabled for arctic
-        config["northern_lights"] = True
+        },
+        "background": "#87CEEB"  # Bright sky blue
+    },
     
-    if is_lava:
-        if time == "night":
-            config["background"] = "#1a0500"
-        elif time == "sunset":
-            config["background"] = "#4a0c06"
-        else:
-            config["background"] = "#7a1b0c"
-        config["ambient"]["color"] = "#ff5c1c"
-        config["ambient"]["intensity"] = 0.6
-        config["directional"]["color"] = "#ffb347"
-        config["directional"]["intensity"] = 1.0
-        config["directional"]["position"] = {"x": 30, "y": 80, "z": 30}
-        config["fog"] = {
-            "color": "#2a0500",
+    "sunset": {
+        "ambient": {
+            "color": "#D85365",  # Soft peachy orange
+            "intensity": 0.5
+        },
+        "directional": {
+            "color": "#D5A29D",  # Gentle warm orange
+            "intensity": 0.9,
+            "position": _POS_LOW_SUN  # Low sun angle
+        },
+        "fog": {
+            "color": "#d9a066",  # Muted golden orange
             "near": 30,
-            "far": 120
-        }
+            "far": 150
+        },
+        "background": "#D85365"
+    },
     
+    "night": {
+        "ambient": {
+            "color": "#4444ff",  # Cool blue
+            "intensity": 0.2
+        },
+        "directional": {
+            "color": "#6666ff",  # Moonlight blue
+            "intensity": 0.3,
+            "position": _POS_MOON
+        },
+        "fog": {
+            "color": "#001133",  # Dark blue
+            "near": 20,
+            "far": 100
+        },
+        "background": "#001133"
+    }
+}
+
+# Interpolation progress resolution (1/255 steps - finer than a color channel can show)
+_PROGRESS_STEPS = 255
+
+# Shifts that unpack a 0xRRGGBB int into its channels (and pack them back)
+_CHANNEL_SHIFTS = np.array([16, 8, 0])
+
+
+@lru_cache(maxsize=256)
+def _hex_int(color: str) -> int:
+    """Packed 0xRRGGBB value of a "#RRGGBB" color (cached - presets reuse a few dozen colors)."""
+    return int(color[1:7], 16)
+
+
+def _clone(value):
+    """Copy nested preset dicts so a theme applier can modify them without touching the base presets."""
+    if isinstance(value, _FrozenDict):
+        # Interned read-only settings are shared, not copied
+        return value
+    if isinstance(value, dict):
+        return {k: _clone(v) for k, v in value.items()}
+    return value
+
+
+def _freeze(value):
+    """Recursively convert nested dicts to _FrozenDict so a finished config can be shared between callers."""
+    if isinstance(value, _FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return _FrozenDict({k: _freeze(v) for k, v in value.items()})
+    return value
+
+
+# Biome-specific lighting overrides. Each applier modifies a copied base preset in place.
+
+def _apply_arctic(config: dict, time: str) -> None:
+    # Arctic cave: bright overhead light (simulating cave opening)
+    config["background"] = "#E0F4FF"  # Bright icy blue (light from cave opening)
+    config["ambient"]["color"] = "#B0E0FF"  # Cool blue ambient
+    config["ambient"]["intensity"] = 0.6  # Moderate brightness
+    config["directional"]["color"] = "#FFFFFF"  # Bright white overhead light
+    config["directional"]["intensity"] = 1.2  # Very bright directional (cave opening)
+    config["directional"]["position"] = _POS_OVERHEAD  # Directly overhead
+    config["fog"] = {
+        "color": "#C8E6FF",  # Light blue fog for cave atmosphere
+        "near": 50,
+        "far": 200
+    }
+    # Ensure northern lights are enabled for arctic
+    config["northern_lights"] = True
+
+
+def _apply_winter(config: dict, time: str) -> None:
+    _apply_arctic(config, time)
+    # Add very light white fog for arctic landscapes (very faint, closer but not blocking sky)
+    if time == "noon":
+        config["fog"]["color"] = "#FFFFFF"  # Very light white fog
+        config["fog"]["near"] = 80   # Start fog a bit closer than before
+        config["fog"]["far"] = 500   # Long range so fog stays very subtle
+        config["background"] = "#87CEEB"  # Blue sky visible
+        config["ambient"]["color"] = "#ffffff"  # Slightly blue-tinted ambient
+    elif time == "sunset":
+        config["fog"]["color"] = "#FFF5E6"  # Warm white fog for sunset
+        config["fog"]["near"] = 120
+        config["fog"]["far"] = 350
+        config["background"] = "#D85365"
+    elif time == "night":
+        config["fog"]["color"] = "#E6E6FF"  # Slightly blue-tinted white fog at night
+        config["fog"]["near"] = 80
+        config["fog"]["far"] = 250
+        config["background"] = "#130039"
+
+
+def _apply_lava(config: dict, time: str) -> None:
+    if time == "night":
+        config["background"] = "#1a0500"
+    elif time == "sunset":
+        config["background"] = "#4a0c06"
+    else:
+        config["background"] = "#7a1b0c"
+    config["ambient"]["color"] = "#ff5c1c"
+    config["ambient"]["intensity"] = 0.6
+    config["directional"]["color"] = "#ffb347"
+    config["directional"]["intensity"] = 1.0
+    config["directional"]["position"] = _POS_LAVA
+    config["fog"] = {
+        "color": "#2a0500",
+        "near": 30,
+        "far": 120
+    }
+
+
+def _apply_city(config: dict, time: str) -> None:
     # City-specific modifications for noon
-    if biome.lower() == "city" and time == "noon":
+    if time == "noon":
         config["background"] = "#D7AFF5"  # Purple-pink sky transitioning to butter cream yellow
         config["ambient"]["intensity"] = 0.85  # Bright ambient light
         config["directional"]["intensity"] = 0.85  # Bright directional light
-    
-    # Theme-specific lighting modifications (Gotham, Metropolis, etc.)
-    is_gotham = biome.lower() in ["gotham", "batman"]
-    if is_gotham:
-        # Gotham is ALWAYS dark and moody
-        config["background"] = "#0a0a0a"  # Almost black
-        config["ambient"]["color"] = "#1a1a1a"  # Dark gray
-        config["ambient"]["intensity"] = 0.2  # Very dim
-        config["directional"]["color"] = "#2a2a3a"  # Dark blue-gray
-        config["directional"]["intensity"] = 0.3  # Dim directional
-        config["directional"]["position"] = {"x": 50, "y": 80, "z": 50}
+
+
+def _apply_gotham(config: dict, time: str) -> None:
+    # Gotham is ALWAYS dark and moody
+    config["background"] = "#0a0a0a"  # Almost black
+    config["ambient"]["color"] = "#1a1a1a"  # Dark gray
+    config["ambient"]["intensity"] = 0.2  # Very dim
+    config["directional"]["color"] = "#2a2a3a"  # Dark blue-gray
+    config["directional"]["intensity"] = 0.3  # Dim directional
+    config["directional"]["position"] = _POS_MOON
+    config["fog"] = {
+        "color": "#1a1a2a",  # Dark fog
+        "near": 30,
+        "far": 150
+    }
+
+
+def _apply_metropolis(config: dict, time: str) -> None:
+    # Metropolis is bright and optimistic
+    config["background"] = "#E8F4F8"  # Bright sky blue
+    config["ambient"]["color"] = "#FFFFFF"  # Pure white
+    config["ambient"]["intensity"] = 0.9  # Very bright
+    config["directional"]["color"] = "#FFD700"  # Golden sunlight
+    config["directional"]["intensity"] = 1.0  # Bright directional
+    config["directional"]["position"] = _POS_HIGH_SUN
+    config["fog"] = None  # Clear skies
+
+
+def _apply_tokyo(config: dict, time: str) -> None:
+    if time == "night":
+        # Tokyo at night: neon glow
+        config["background"] = "#1a0a2e"  # Dark purple
+        config["ambient"]["color"] = "#2d1b3d"  # Purple ambient
+        config["ambient"]["intensity"] = 0.5
+        config["directional"]["color"] = "#FF00FF"  # Magenta neon
+        config["directional"]["intensity"] = 0.7
+        config["fog"] = {
+            "color": "#1a0a2e",
+            "near": 40,
+            "far": 180
+        }
+
+
+def _apply_venice(config: dict, time: str) -> None:
+    # Venice: romantic golden hour
+    config["background"] = "#FFB347"  # Warm sunset
+    config["ambient"]["color"] = "#FFD700"  # Golden
+    config["ambient"]["intensity"] = 0.6
+    config["directional"]["color"] = "#FF8C00"  # Orange sunset
+    config["directional"]["intensity"] = 0.8
+    config["directional"]["position"] = _POS_LOW_SUN
+    config["fog"] = None
+
+
+def _apply_paris(config: dict, time: str) -> None:
+    # Paris: romantic sunset
+    config["background"] = "#FFB6C1"  # Soft pink
+    config["ambient"]["color"] = "#FFE4E1"  # Misty rose
+    config["ambient"]["intensity"] = 0.7
+    config["directional"]["color"] = "#FFD700"  # Golden hour
+    config["directional"]["intensity"] = 0.8
+    config["fog"] = None
+
+
+def _apply_futuristic(config: dict, time: str) -> None:
+    # Futuristic/Cyberpunk biome modifications
+    if time == "night":
+        # Dark cyberpunk night: very dark with neon accents
+        config["background"] = "#0a0a1a"  # Almost black with slight blue
+        config["ambient"]["color"] = "#1a1a3a"  # Dark blue ambient
+        config["ambient"]["intensity"] = 0.3
+        config["directional"]["color"] = "#00d4ff"  # Cyan neon light
+        config["directional"]["intensity"] = 0.6
+        config["directional"]["position"] = _POS_MOON
         config["fog"] = {
-            "color": "#1a1a2a",  # Dark fog
+            "color": "#0a0a1a",
             "near": 30,
             "far": 150
         }
-        # Force night time for Gotham
-        time = "night"
-    
-    is_metropolis = biome.lower() in ["metropolis", "superman"]
-    if is_metropolis:
-        # Metropolis is bright and optimistic
-        config["background"] = "#E8F4F8"  # Bright sky blue
-        config["ambient"]["color"] = "#FFFFFF"  # Pure white
-        config["ambient"]["intensity"] = 0.9  # Very bright
-        config["directional"]["color"] = "#FFD700"  # Golden sunlight
-        config["directional"]["intensity"] = 1.0  # Bright directional
-        config["directional"]["position"] = {"x": 50, "y": 100, "z": 50}
-        config["fog"] = None  # Clear skies
-        # Force noon for Metropolis
-        time = "noon"
-    
-    is_tokyo = biome.lower() in ["tokyo", "japan", "tokyo_world"]
-    if is_tokyo and time == "night":
-        # Tokyo at night: neon glow
+    elif time == "sunset":
+        # Cyberpunk sunset: dark with purple/pink neon
         config["background"] = "#1a0a2e"  # Dark purple
         config["ambient"]["color"] = "#2d1b3d"  # Purple ambient
-        config["ambient"]["intensity"] = 0.5
-        config["directional"]["color"] = "#FF00FF"  # Magenta neon
+        config["ambient"]["intensity"] = 0.4
+        config["directional"]["color"] = "#ff00ff"  # Magenta neon
         config["directional"]["intensity"] = 0.7
+        config["directional"]["position"] = _POS_LOW_SUN
         config["fog"] = {
             "color": "#1a0a2e",
             "near": 40,
             "far": 180
         }
-    
-    is_venice = biome.lower() in ["venice", "italy", "venice_world"]
-    if is_venice:
-        # Venice: romantic golden hour
-        config["background"] = "#FFB347"  # Warm sunset
-        config["ambient"]["color"] = "#FFD700"  # Golden
-        config["ambient"]["intensity"] = 0.6
-        config["directional"]["color"] = "#FF8C00"  # Orange sunset
-        config["directional"]["intensity"] = 0.8
-        config["directional"]["position"] = {"x": 100, "y": 20, "z": 50}
-        config["fog"] = None
-    
-    is_paris = biome.lower() in ["paris", "france", "paris_world"]
-    if is_paris:
-        # Paris: romantic sunset
-        config["background"] = "#FFB6C1"  # Soft pink
-        config["ambient"]["color"] = "#FFE4E1"  # Misty rose
-        config["ambient"]["intensity"] = 0.7
-        config["directional"]["color"] = "#FFD700"  # Golden hour
+    else:  # noon
+        # Cyberpunk day: dark with bright neon highlights
+        config["background"] = "#0f1419"  # Dark blue-grey
+        config["ambient"]["color"] = "#1a1a2e"  # Dark blue ambient
+        config["ambient"]["intensity"] = 0.5
+        config["directional"]["color"] = "#00d4ff"  # Bright cyan
         config["directional"]["intensity"] = 0.8
-        config["fog"] = None
+        config["directional"]["position"] = _POS_HIGH_SUN
+        config["fog"] = {
+            "color": "#0f1419",
+            "near": 50,
+            "far": 200
+        }
+
+
+# Lowercased biome -> theme, and theme -> applier
+_BIOME_THEME = {
+    biome: theme
+    for theme, biomes in (
+        ("winter", ("arctic", "winter", "icy")),
+        ("arctic", ("snow", "frozen")),
+        ("lava", ("lava", "volcanic", "volcano", "magma")),
+        ("city", ("city",)),
+        ("gotham", ("gotham", "batman")),
+        ("metropolis", ("metropolis", "superman")),
+        ("tokyo", ("tokyo", "japan", "tokyo_world")),
+        ("venice", ("venice", "italy", "venice_world")),
+        ("paris", ("paris", "france", "paris_world")),
+        ("futuristic", ("futuristic", "cyberpunk", "neon", "tech")),
+    )
+    for biome in biomes
+}
+
+_THEME_APPLIERS = {
+    "winter": _apply_winter,
+    "arctic": _apply_arctic,
+    "lava": _apply_lava,
+    "city": _apply_city,
+    "gotham": _apply_gotham,
+    "metropolis": _apply_metropolis,
+    "tokyo": _apply_tokyo,
+    "venice": _apply_venice,
+    "paris": _apply_paris,
+    "futuristic": _apply_futuristic,
+}
+
+# Themes that keep fog; every other biome has it removed
+_FOGGY_THEMES = frozenset(["winter", "lava", "futuristic"])
+_NORTHERN_LIGHTS_THEMES = frozenset(["winter", "arctic"])
+
+
+def _build_preset(time: str, theme: Optional[str]) -> dict:
+    """Build the preset for a time and biome theme (None for biomes without overrides)."""
+    base = _BASE_PRESETS.get(time, _BASE_PRESETS["noon"])
+    if theme is None:
+        # No biome overrides: base preset without fog, no copy of the nested settings needed
+        return _freeze({**base, "fog": None, "northern_lights": False})
     
-    # Futuristic/Cyberpunk biome modifications
-    is_futuristic = biome.lower() in ["futuristic", "cyberpunk", "neon", "tech"]
-    if is_futuristic:
-        if time == "night":
-            # Dark cyberpunk night: very dark with neon accents
-            config["background"] = "#0a0a1a"  # Almost black with slight blue
-            config["ambient"]["color"] = "#1a1a3a"  # Dark blue ambient
-            config["ambient"]["intensity"] = 0.3
-            config["directional"]["color"] = "#00d4ff"  # Cyan neon light
-            config["directional"]["intensity"] = 0.6
-            config["directional"]["position"] = {"x": 50, "y": 80, "z": 50}
-            config["fog"] = {
-                "color": "#0a0a1a",
-                "near": 30,
-                "far": 150
-            }
-        elif time == "sunset":
-            # Cyberpunk sunset: dark with purple/pink neon
-            config["background"] = "#1a0a2e"  # Dark purple
-            config["ambient"]["color"] = "#2d1b3d"  # Purple ambient
-            config["ambient"]["intensity"] = 0.4
-            config["directional"]["color"] = "#ff00ff"  # Magenta neon
-            config["directional"]["intensity"] = 0.7
-            config["directional"]["position"] = {"x": 100, "y": 20, "z": 50}
-            config["fog"] = {
-                "color": "#1a0a2e",
-                "near": 40,
-                "far": 180
-            }
-        else:  # noon
-            # Cyberpunk day: dark with bright neon highlights
-            config["background"] = "#0f1419"  # Dark blue-grey
-            config["ambient"]["color"] = "#1a1a2e"  # Dark blue ambient
-            config["ambient"]["intensity"] = 0.5
-            config["directional"]["color"] = "#00d4ff"  # Bright cyan
-            config["directional"]["intensity"] = 0.8
-            config["directional"]["position"] = {"x": 50, "y": 100, "z": 50}
-            config["fog"] = {
-                "color": "#0f1419",
-                "near": 50,
-                "far": 200
-            }
+    # Get base preset
+    config = _clone(base)
+    _THEME_APPLIERS[theme](config, time)
     
     # Remove fog for non-arctic, non-futuristic, non-lava biomes
-    if not is_winter and not is_futuristic and not is_lava:
+    if theme not in _FOGGY_THEMES:
         config["fog"] = None
     
-    if is_winter:
-        # Add very light white fog for arctic landscapes (very faint, closer but not blocking sky)
-        if time == "noon":
-            config["fog"]["color"] = "#FFFFFF"  # Very light white fog
-            config["fog"]["near"] = 80   # Start fog a bit closer than before
-            config["fog"]["far"] = 500   # Long range so fog stays very subtle
-            config["background"] = "#87CEEB"  # Blue sky visible
-            config["ambient"]["color"] = "#ffffff"  # Slightly blue-tinted ambient
-        elif time == "sunset":
-            config["fog"]["color"] = "#FFF5E6"  # Warm white fog for sunset
-            config["fog"]["near"] = 120
-            config["fog"]["far"] = 350
-            config["background"] = "#D85365"
-        elif time == "night":
-            config["fog"]["color"] = "#E6E6FF"  # Slightly blue-tinted white fog at night
-            config["fog"]["near"] = 80
-            config["fog"]["far"] = 250
-            config["background"] = "#130039"
-    
     # Add northern lights flag for arctic biomes
-    config["northern_lights"] = is_arctic
+    config["northern_lights"] = theme in _NORTHERN_LIGHTS_THEMES
     
-    return config
+    return _freeze(config)
+
+
+# Every (time, theme) preset, built once at import - lookups are a single dict get
+_PRESET_CACHE = {
+    (time, theme): _build_preset(time, theme)
+    for time in _BASE_PRESETS
+    for theme in (None, *_THEME_APPLIERS)
+}
+
+
+def get_lighting_preset(time: str, biome: str = "city") -> dict:
+    """
+    Return lighting configuration for Three.js based on time of day and biome
+    
+    Args:
+        time: "noon", "sunset", or "night"
+        biome: "arctic", "city", etc.
+    
+    Returns:
+        Read-only dict with ambient, directional, and fog settings (shared - copy.deepcopy to modify)
+    """
+    return _lighting_preset(time, biome.lower())
+
+
+def _lighting_preset(time: str, biome: str) -> dict:
+    """Frozen preset for a time and lowercased biome."""
+    theme = _BIOME_THEME.get(biome)
+    preset = _PRESET_CACHE.get((time, theme))
+    if preset is None:
+        # Unknown time: falls back to the noon base, built on demand
+        preset = _build_preset(time, theme)
+    return preset
+
+
+# Sky colors per time; only the exact "arctic" biome has its own table
+_DEFAULT_SKY_COLORS = {
+    "noon": "#e9f3ff",    # Sky blue
+    "sunset": "#d9a066",  # Muted golden orange
+    "night": "#001133"    # Dark blue
+}
+_SKY_COLORS = {
+    "arctic": {
+        "noon": "#CCE5FF",    # Icy blue
+        "sunset": "#B3D9FF",  # Cool sunset
+        "night": "#001133"    # Dark blue
+    }
+}
 
 
 def get_sky_color(time: str, biome: str = "city") -> str:
@@ -270,18 +413,7 @@ def get_sky_color(time: str, biome: str = "city") -> str:
     Returns:
         Hex color string
     """
-    if biome == "arctic":
-        colors = {
-            "noon": "#CCE5FF",    # Icy blue
-            "sunset": "#B3D9FF",  # Cool sunset
-            "night": "#001133"    # Dark blue
-        }
-    else:
-        colors = {
-            "noon": "#e9f3ff",    # Sky blue
-            "sunset": "#d9a066",  # Muted golden orange
-            "night": "#001133"    # Dark blue
-        }
+    colors = _SKY_COLORS.get(biome, _DEFAULT_SKY_COLORS)
     return colors.get(time, colors["noon"])
 
 
@@ -297,51 +429,95 @@ def interpolate_lighting(from_time: str, to_time: str, progress: float, biome: s
         biome: Current biome for biome-specific lighting
     
     Returns:
-        Interpolated lighting config
+        Interpolated lighting config, read-only like get_lighting_preset
     """
-    from_preset = get_lighting_preset(from_time, biome)
-    to_preset = get_lighting_preset(to_time, biome)
-    
-    def lerp(a: float, b: float, t: float) -> float:
-        """Linear interpolation"""
-        return a + (b - a) * t
-    
-    def lerp_color(c1: str, c2: str, t: float) -> str:
-        """Interpolate between two hex colors"""
-        r1, g1, b1 = int(c1[1:3], 16), int(c1[3:5], 16), int(c1[5:7], 16)
-        r2, g2, b2 = int(c2[1:3], 16), int(c2[3:5], 16), int(c2[5:7], 16)
-        
-        r = int(lerp(r1, r2, t))
-        g = int(lerp(g1, g2, t))
-        b = int(lerp(b1, b2, t))
-        
-        return f"#{r:02x}{g:02x}{b:02x}"
+    # Quantize progress so smooth time-of-day transitions mostly hit the cache
+    q = round(progress * _PROGRESS_STEPS)
+    return _interpolate_lighting(from_time, to_time, q, biome.lower())
+
+
+# One full transition fills up to _PROGRESS_STEPS + 1 entries; room for a day cycle across several biomes
+@lru_cache(maxsize=4096)
+def _interpolate_lighting(from_time: str, to_time: str, q: int, biome: str) -> dict:
+    """Frozen interpolated config at progress q / _PROGRESS_STEPS for a lowercased biome (cached)."""
+    return _freeze(_lerp_presets(from_time, to_time, np.array([q / _PROGRESS_STEPS]), biome)[0])
+
+
+# Stand-in for the fog fields of fogless presets - interpolation drops fog for them
+_NO_FOG = {"color": "#000000", "near": 0, "far": 0}
+
+
+def _preset_colors(preset: dict) -> List[int]:
+    fog = preset["fog"] or _NO_FOG
+    return [_hex_int(preset["ambient"]["color"]), _hex_int(preset["directional"]["color"]),
+            _hex_int(fog["color"]), _hex_int(preset["background"])]
+
+
+def _preset_values(preset: dict) -> List[float]:
+    directional = preset["directional"]
+    position = directional["position"]
+    fog = preset["fog"] or _NO_FOG
+    return [preset["ambient"]["intensity"], directional["intensity"], position["x"], position["y"], position["z"],
+            fog["near"], fog["far"]]
+
+
+@lru_cache(maxsize=256)
+def _preset_arrays(time: str, biome: str):
+    """
+    A preset as one read-only float row - 4x3 RGB channels, then the 7 numeric settings - plus whether it has fog.
+    Hex colors are parsed once per preset here; interpolation only formats back to hex at its return.
+    """
+    preset = _lighting_preset(time, biome)
+    packed = np.array(_preset_colors(preset), dtype=np.int64)
+    channels = (packed[:, None] >> _CHANNEL_SHIFTS) & 0xFF
+    row = np.concatenate((channels.ravel(), _preset_values(preset))).astype(np.float64)
+    row.setflags(write=False)
+    return row, preset["fog"] is not None
+
+
+# Leading entries of a _preset_arrays row that are color channels
+_N_CHANNELS = 12
+
+
+def _lerp_presets(from_time: str, to_time: str, t: np.ndarray, biome: str) -> List[dict]:
+    """Lerp every color channel and numeric setting of two presets for each progress in t in one NumPy pass."""
+    src, from_fog = _preset_arrays(from_time, biome)
+    dst, to_fog = _preset_arrays(to_time, biome)
+    # Most biomes have no fog - keep it None unless both ends have some
+    has_fog = from_fog and to_fog
+    out = src + (dst - src) * t[:, None]
+    channels = np.clip(out[:, :_N_CHANNELS].astype(np.int64), 0, 255).reshape(-1, 4, 3)
+    # Pack every color back to 0xRRGGBB in one pass (channel bits don't overlap, so sum == or),
+    # then format each packed value to "#rrggbb" once
+    packed = (channels << _CHANNEL_SHIFTS).sum(axis=2).tolist()
+    colors = [[f"#{color:06x}" for color in row] for row in packed]
+    values = out[:, _N_CHANNELS:].tolist()
     
     # Northern lights flag doesn't interpolate - it's based on biome
-    is_arctic = biome.lower() in ["arctic", "winter", "icy", "snow", "frozen"]
+    is_arctic = _BIOME_THEME.get(biome) in _NORTHERN_LIGHTS_THEMES
     
-    return {
-        "ambient": {
-            "color": lerp_color(from_preset["ambient"]["color"], to_preset["ambient"]["color"], progress),
-            "intensity": lerp(from_preset["ambient"]["intensity"], to_preset["ambient"]["intensity"], progress)
-        },
-        "directional": {
-            "color": lerp_color(from_preset["directional"]["color"], to_preset["directional"]["color"], progress),
-            "intensity": lerp(from_preset["directional"]["intensity"], to_preset["directional"]["intensity"], progress),
-            "position": {
-                "x": lerp(from_preset["directional"]["position"]["x"], to_preset["directional"]["position"]["x"], progress),
-                "y": lerp(from_preset["directional"]["position"]["y"], to_preset["directional"]["position"]["y"], progress),
-                "z": lerp(from_preset["directional"]["position"]["z"], to_preset["directional"]["position"]["z"], progress)
-            }
-        },
-        "fog": {
-            "color": lerp_color(from_preset["fog"]["color"], to_preset["fog"]["color"], progress),
-            "near": lerp(from_preset["fog"]["near"], to_preset["fog"]["near"], progress),
-            "far": lerp(from_preset["fog"]["far"], to_preset["fog"]["far"], progress)
-        },
-        "background": lerp_color(from_preset["background"], to_preset["background"], progress),
-        "northern_lights": is_arctic
-    }
+    return [
+        {
+            "ambient": {
+                "color": ambient,
+                "intensity": ambient_intensity
+            },
+            "directional": {
+                "color": directional,
+                "intensity": directional_intensity,
+                "position": {"x": x, "y": y, "z": z}
+            },
+            "fog": {
+                "color": fog,
+                "near": near,
+                "far": far
+            } if has_fog else None,
+            "background": background,
+            "northern_lights": is_arctic
+        }
+        for (ambient, directional, fog, background), (ambient_intensity, directional_intensity, x, y, z, near, far)
+        in zip(colors, values)
+    ]
 
 
 # Example usage
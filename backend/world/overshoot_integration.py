@@ -11,10 +11,20 @@ To use:
 2. Overshoot AI (if REST endpoint exists): Set OVERSHOOT_API_KEY in .env
 """
 import os
+import io
+import asyncio
+import re
+import binascii
 import requests
 from typing import Dict, List, Optional
 import json
 from dotenv import load_dotenv
+from PIL import Image
+
+try:
+    import pybase64 as base64  # SIMD base64 codec with the stdlib's API
+except ImportError:  # pybase64 is optional - the stdlib codec is a drop-in fallback
+    import base64
 
 # Load environment variables from .env file
 load_dotenv()
@@ -35,6 +45,76 @@ if not OPENAI_API_KEY and not OVERSHOOT_API_KEY:
     print("[VISION] WARNING: No vision API keys found!")
     print("[VISION] Set either OPENAI_API_KEY or OVERSHOOT_API_KEY in backend/.env")
 
+# Long-edge cap for images sent to the vision model (0 sends uploads untouched). Tokens, upload
+# size and latency all grow with resolution, and the model only needs the scene's gist.
+VISION_MAX_EDGE = int(os.getenv("VISION_MAX_EDGE", "768"))
+
+# The "data:<mime>;base64," header of a data URL always fits in this many leading chars
+_DATA_URL_HEADER_MAX = 64
+
+
+def _strip_data_url(image_data: str) -> Optional[str]:
+    """
+    Base64 payload of an image string, with any data URL prefix removed.
+    Only the header is scanned for the comma (never the multi-MB payload).
+    Returns None for a data URL without a comma in its header.
+    """
+    if not image_data.startswith("data:"):
+        return image_data
+    comma_index = image_data.find(",", 0, _DATA_URL_HEADER_MAX)
+    if comma_index == -1:
+        return None
+    return image_data[comma_index + 1:]
+
+
+# Standard or URL-safe base64 alphabet with at most two trailing pad characters
+_BASE64_RE = re.compile(r"[A-Za-z0-9+/_-]*={0,2}")
+
+# Maps the URL-safe alphabet's "-" and "_" onto the standard "+" and "/"
+_URLSAFE_TO_STANDARD = str.maketrans("-_", "+/")
+
+
+def _compact_base64(image_base64: str) -> str:
+    """Drop the line breaks (and any other whitespace) MIME-style encoders wrap base64 with."""
+    return "".join(image_base64.split())
+
+
+def _is_base64(image_base64: str) -> bool:
+    """Cheap alphabet and length check for a compacted base64 payload, without decoding it."""
+    return len(image_base64) % 4 == 0 and _BASE64_RE.fullmatch(image_base64) is not None
+
+
+def _decode_base64(image_base64: str) -> Optional[bytes]:
+    """Decode a compacted standard or URL-safe base64 image payload; None if it isn't valid base64."""
+    if "-" in image_base64 or "_" in image_base64:
+        image_base64 = image_base64.translate(_URLSAFE_TO_STANDARD)
+    try:
+        return base64.b64decode(image_base64, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _shrink_image(raw: bytes) -> Optional[str]:
+    """
+    Downscale an image to VISION_MAX_EDGE on its long edge and re-encode it as JPEG (quality 80).
+    Returns the new base64 payload, or None to send the upload as-is (already small JPEG,
+    resizing disabled, or a format PIL can't read).
+    """
+    if VISION_MAX_EDGE <= 0:
+        return None
+    try:
+        with Image.open(io.BytesIO(raw)) as img:
+            if max(img.size) <= VISION_MAX_EDGE and img.format == "JPEG":
+                return None
+            img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE))
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, "JPEG", quality=80, optimize=True)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"[VISION] Could not resize image, sending original: {e}")
+        return None
+    return base64.b64encode(buf.getvalue()).decode("ascii")
+
+
 async def analyze_with_openai_vision(image_data: str) -> Optional[Dict]:
     """
     Alternative: Use OpenAI Vision API to analyze environment.
@@ -73,9 +153,18 @@ async def analyze_with_openai_vision(image_data: str) -> Optional[Dict]:
         )
         
         # Remove data URL prefix
-        image_base64 = image_data
-        if ',' in image_data:
-            image_base64 = image_data.split(',')[1]
+        image_base64 = _strip_data_url(image_data)
+        if image_base64 is None:
+            print(f"[VISION] ❌ Invalid data URL format (no comma found)")
+            print(f"[VISION] Image data preview: {image_data[:100]}")
+            return None
+        compact = _compact_base64(image_base64)
+        if image_data.startswith("data:"):
+            # A data URL can be sent as-is unless its payload was line-wrapped
+            image_url = image_data if compact == image_base64 else image_data[:len(image_data) - len(image_base64)] + compact
+        else:
+            image_url = f"data:image/jpeg;base64,{compact}"
+        image_base64 = compact
         
         # Validate image size (base64 images should be much larger)
         if len(image_base64) < 1000:
@@ -83,6 +172,20 @@ async def analyze_with_openai_vision(image_data: str) -> Optional[Dict]:
             print(f"[VISION] Image data preview: {image_base64[:200]}")
             return None
         
+        # Catch corrupt uploads locally instead of paying for an API call that can't read them
+        raw = _decode_base64(image_base64)
+        if raw is None:
+            print(f"[VISION] ❌ Image data is not valid base64")
+            print(f"[VISION] Image data preview: {image_base64[:200]}")
+            return None
+        
+        # PIL decode/resize/encode is CPU-bound - run it off the event loop
+        small_base64 = await asyncio.to_thread(_shrink_image, raw)
+        if small_base64 is not None:
+            print(f"[VISION] Resized image for vision: {len(image_base64)} -> {len(small_base64)} base64 chars")
+            image_base64 = small_base64
+            image_url = f"data:image/jpeg;base64,{small_base64}"
+        
         print(f"[VISION] Using {'OpenRouter' if is_openrouter else 'OpenAI'} Vision API... (image size: {len(image_base64)} chars)")
         
         # For OpenRouter, use provider/model format (e.g., "openai/gpt-4o-mini")
@@ -132,7 +235,8 @@ Detect objects like: trees, rocks, buildings, mountains, street lamps, etc."""
                         {
                             "type": "image_url",
                             "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}"
+                                "url": image_url,
+                                "detail": "low"
                             }
                         }
                     ]
@@ -203,21 +307,11 @@ async def analyze_environment(image_data: str) -> Dict:
     
     try:
         # Remove data URL prefix if present (format: "data:image/jpeg;base64,/9j/4AAQ...")
-        image_base64 = image_data.strip()
-        
-        # Check if it's a data URL
-        if image_base64.startswith('data:'):
-            # Find the comma that separates the metadata from the base64 data
-            comma_index = image_base64.find(',')
-            if comma_index != -1:
-                image_base64 = image_base64[comma_index + 1:]
-            else:
-                print(f"[VISION] [ERROR] Invalid data URL format (no comma found)")
-                print(f"[VISION] Image data preview (first 100 chars): {image_data[:100]}")
-                return None
-        else:
-            # Assume it's already base64
-            image_base64 = image_data
+        image_base64 = _strip_data_url(image_data.strip())
+        if image_base64 is None:
+            print(f"[VISION] [ERROR] Invalid data URL format (no comma found)")
+            print(f"[VISION] Image data preview (first 100 chars): {image_data[:100]}")
+            return None
         
         # Validate that we have actual data
         if not image_base64 or len(image_base64) < 100:
@@ -226,6 +320,13 @@ async def analyze_environment(image_data: str) -> Dict:
             print(f"[VISION] Image data preview (first 200 chars): {image_data[:200]}")
             return None
         
+        # Overshoot only needs the string, so check it looks like base64 instead of decoding it
+        image_base64 = _compact_base64(image_base64)
+        if not _is_base64(image_base64):
+            print(f"[VISION] [ERROR] Image data is not valid base64")
+            print(f"[VISION] Image data preview (first 200 chars): {image_data[:200]}")
+            return None
+        
         headers = {
             "Authorization": f"Bearer {OVERSHOOT_API_KEY}",
             "Content-Type": "application/json"
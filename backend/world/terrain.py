@@ -445,10 +445,13 @@ def save_heightmap_png(prompt_parser_response, filename="assets/heightmaps/terra
     print(f"Terrain saved as {filename}")
 
 def get_walkable_points(placement_mask, radius=1):
-    h, w = len(placement_mask), len(placement_mask[0])
-    points = []
-    for z in range(radius, h-radius):
-        for x in range(radius, w-radius):
-            if placement_mask[z][x] == 1:
-                points.append((x, z))
-    return points
\ No newline at end of file
+    xs, zs = get_walkable_points_array(placement_mask, radius).T.tolist()
+    return list(zip(xs, zs))
+
+def get_walkable_points_array(placement_mask, radius=1):
+    """Walkable (x, z) grid indices as an (N, 2) int32 array, same order as get_walkable_points."""
+    mask = np.asarray(placement_mask)
+    h, w = mask.shape
+    # Row-major nonzero keeps the same (z, then x) order as scanning the grid cell by cell
+    zs, xs = np.nonzero(mask[radius:h-radius, radius:w-radius] == 1)
+    return np.stack((xs, zs), axis=1).astype(np.int32) + radius